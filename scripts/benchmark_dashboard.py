@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+대시보드 성능 벤치마크
+합성 리포트 데이터(날짜별 CSV와 미리보기 이미지 폴더)를 만들고, 대시보드의 데이터 준비 단계별
+실행 시간과 최대 메모리 사용량을 측정합니다. 메모리는 tracemalloc으로 측정하므로 시간에는
+추적 부하가 포함됩니다. (변경 전후 비교용 기준값으로 사용)
+AppTest 전체 실행은 st.cache_resource에 남은 공유 데이터셋이 다음 크기에 재사용되지 않도록
+크기마다 별도 프로세스에서 측정합니다.
+작은 크기에서는 리포트 API의 커서로 끝까지 페이지를 넘겨 모든 행이 한 번씩 나오는지도 확인합니다.
+
+사용법:
+    python scripts/benchmark_dashboard.py                       # 1천, 1만, 10만, 100만 건
+    python scripts/benchmark_dashboard.py --sizes 1000 10000 --apptest
+    python scripts/benchmark_dashboard.py --output logs/benchmark.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from datetime import date, timedelta
+
+# src 폴더를 Python 경로에 추가
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import numpy as np
+import pandas as pd
+
+import api
+import dashboard_data
+import report_dataset
+import report_query
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+BROKERS = [
+    "미래에셋증권", "삼성증권", "NH투자증권", "한국투자증권", "KB증권", "키움증권", "대신증권",
+    "신한투자증권", "하나증권", "메리츠증권", "유안타증권", "교보증권", "현대차증권", "IBK투자증권",
+    "DB금융투자", "SK증권", "하이투자증권", "유진투자증권", "이베스트투자증권", "상상인증권",
+]
+STOCK_COUNT = 2000
+PAGE_SIZE = 50
+
+
+def generate_dataset(root, rows, rows_per_day=100, thumbnail_ratio=0.1, seed=0):
+    """root 아래에 data/csv 날짜별 파일과 data/images/first_page 이미지를 생성"""
+    rng = np.random.default_rng(seed)
+    csv_dir = os.path.join(root, 'data', 'csv')
+    image_dir = os.path.join(root, 'data', 'images', 'first_page')
+    os.makedirs(csv_dir, exist_ok=True)
+    os.makedirs(image_dir, exist_ok=True)
+
+    stocks = np.array([f"종목{i:04d}" for i in range(STOCK_COUNT)])
+    frame = pd.DataFrame({
+        '종목명': stocks[rng.integers(0, STOCK_COUNT, rows)],
+        '제목': [f"리포트 제목 {i} - 실적 전망과 투자 포인트" for i in range(rows)],
+        '증권사': np.array(BROKERS)[rng.integers(0, len(BROKERS), rows)],
+        '첨부': np.where(rng.random(rows) < 0.8, "https://stock.pstatic.net/stock-research/company/1/report.pdf", ""),
+        # 조회수를 읽지 못한 행(NaN)도 일부 포함
+        '조회수': pd.Series(rng.lognormal(6, 1, rows).astype(int)).where(rng.random(rows) >= 0.01),
+        '리포트ID': np.arange(rows) + 1,
+    })
+
+    # 최근 날짜부터 rows_per_day건씩 배정
+    day_index = np.arange(rows) // rows_per_day
+    last_day = date.today()
+    for index, part in frame.groupby(day_index):
+        day = last_day - timedelta(days=int(index))
+        part = part.assign(작성일=day.strftime('%y.%m.%d'))[report_query.REPORT_COLUMNS]
+        part.to_csv(os.path.join(csv_dir, f"research_reports_{day.strftime('%Y%m%d')}.csv"),
+                    index=False, encoding='utf-8-sig')
+
+    # 미리보기 이미지 (내용은 비어 있어도 파일 탐색 비용은 같음)
+    for i in range(int(rows * thumbnail_ratio)):
+        open(os.path.join(image_dir, f"{stocks[i % STOCK_COUNT]}_{i}.jpg"), 'wb').close()
+
+    return csv_dir, image_dir
+
+
+def measure(results, stage, func, *args, **kwargs):
+    """func 실행 시간과 최대 메모리 사용량을 기록하고 결과를 반환"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = func(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results.append({"stage": stage, "seconds": round(elapsed, 4), "peak_mb": round(peak / 1024 / 1024, 2)})
+    return value
+
+
+def run_apptest(root, timeout):
+    """Streamlit AppTest로 대시보드 전체 스크립트를 한 번 실행"""
+    from streamlit.testing.v1 import AppTest
+
+    cwd = os.getcwd()
+    os.chdir(root)  # 대시보드는 상대 경로(data/, logs/)를 사용
+    try:
+        app = AppTest.from_file(os.path.join(PROJECT_ROOT, 'src', 'dashboard.py'), default_timeout=timeout)
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+    finally:
+        os.chdir(cwd)
+
+
+def run_apptest_isolated(root, timeout):
+    """새 프로세스에서 run_apptest를 측정한 결과 (이전 크기의 캐시/백그라운드 스레드 영향 없음)"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--apptest-child', root, '--apptest-timeout', str(timeout)],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"AppTest 실행 실패: {completed.stderr.strip().splitlines()[-1:]}")
+    # 마지막 줄이 측정 결과 JSON
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _render_rows_script(page_df):
+    import dashboard_data
+    dashboard_data.render_report_rows(page_df)
+
+
+def run_row_widgets(page_df, timeout):
+    """목록 한 페이지의 행별 위젯만 AppTest로 그림"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(_render_rows_script, args=(page_df,), default_timeout=timeout)
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+
+def page_through(query, spec):
+    """API와 같은 방식(limit + 1행 조회, 마지막 행으로 커서 생성)으로 끝까지 넘긴 리포트ID 목록"""
+    columns = tuple(['리포트ID'] + report_query.order_columns(spec))
+    report_ids = []
+    cursor = None
+    while True:
+        page_spec = spec if cursor is None else replace(spec, after=api.decode_cursor(cursor, spec))
+        frame = query(replace(page_spec, limit=spec.limit + 1, columns=columns)).frame
+        report_ids.extend(frame['리포트ID'].iloc[:spec.limit])
+        if len(frame) <= spec.limit:
+            return report_ids
+        cursor = api.encode_cursor(spec, frame.iloc[spec.limit - 1])
+
+
+def check_keyset_paging(query, full_range, rows):
+    """정렬 컬럼과 방향마다 커서로 넘긴 결과에 모든 행이 한 번씩 나오는지 확인"""
+    for sort_by in report_query.SORT_COLUMNS:
+        for ascending in (False, True):
+            spec = replace(full_range, sort_by=sort_by, ascending=ascending, limit=api.MAX_LIMIT, after=())
+            report_ids = page_through(query, spec)
+            if len(report_ids) != rows or len(set(report_ids)) != rows:
+                raise RuntimeError(f"커서 페이지 누락/중복: sort={sort_by}, asc={ascending}, "
+                                   f"{len(set(report_ids))}/{rows}건")
+
+
+def benchmark_size(rows, args):
+    """데이터 크기 하나에 대한 단계별 측정 결과"""
+    root = tempfile.mkdtemp(prefix=f"dashboard_bench_{rows}_")
+    results = []
+    try:
+        csv_dir, image_dir = measure(results, "generate", generate_dataset, root, rows,
+                                     rows_per_day=args.rows_per_day, thumbnail_ratio=args.thumbnail_ratio)
+
+        partitions = measure(results, "list_partitions", report_query.list_partitions, csv_dir)
+        days = list(partitions)
+
+        # 대시보드는 프로세스 공유 데이터셋에 파티션을 읽어 두고 재사용
+        dataset = report_dataset.ReportDataset(0, partitions)
+        measure(results, "load_partitions", lambda: [dataset.partition(day) for day in days])
+        results[-1]["dataset_mb"] = round(dataset.memory_usage() / 1024 / 1024, 2)
+        query = dataset.query
+
+        latest = report_query.ReportFilter(date_from=days[-1], date_to=days[-1])
+        full_range = report_query.ReportFilter(date_from=days[0], date_to=days[-1])
+        list_columns = ('종목명', '제목', '증권사', '첨부', '작성일', '조회수')
+
+        measure(results, "query_cold_full_range",
+                report_query.run_query, replace(full_range, columns=('증권사', '조회수')), partitions)
+        chart_df = measure(results, "query_chart_full_range",
+                           lambda: query(replace(full_range, columns=('증권사', '조회수'))).frame)
+        page_df = measure(results, "query_page_full_range", lambda: query(replace(
+            full_range, columns=list_columns, sort_by='조회수', limit=PAGE_SIZE)).frame)
+        measure(results, "query_search_full_range",
+                query, replace(full_range, search="종목0001", columns=list_columns))
+        measure(results, "query_latest_day", query, latest)
+
+        measure(results, "preview_paths_page", dashboard_data.add_display_columns, page_df, image_dir)
+        if rows <= args.preview_all_limit:
+            # 목록 전체에 미리보기 경로를 계산하는 경우 (행마다 glob)
+            all_df = query(replace(full_range, columns=list_columns)).frame
+            measure(results, "preview_paths_all", dashboard_data.add_display_columns, all_df, image_dir)
+            measure(results, "api_keyset_paging", check_keyset_paging, query, full_range, rows)
+
+        top_companies = measure(results, "company_counts",
+                                lambda: chart_df['증권사'].value_counts().head(10))
+        fig_company = measure(results, "company_chart", dashboard_data.build_company_chart, top_companies)
+        fig_views = measure(results, "views_histogram", dashboard_data.build_views_histogram, chart_df)
+        # st.plotly_chart는 그림을 JSON으로 직렬화해 브라우저로 보냄
+        measure(results, "charts_to_json", lambda: (fig_company.to_json(), fig_views.to_json()))
+
+        if args.apptest:
+            importlib.import_module('streamlit.testing.v1')  # 첫 측정에 import 시간이 들어가지 않도록 미리 로드
+            measure(results, "row_widgets_page", run_row_widgets, page_df, args.apptest_timeout)
+            results.append(run_apptest_isolated(root, args.apptest_timeout))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def print_results(rows, results):
+    print(f"\n📊 {rows:,}건")
+    print(f"{'단계':<28}{'시간(초)':>12}{'최대 메모리(MB)':>18}")
+    for result in results:
+        print(f"{result['stage']:<28}{result['seconds']:>12.4f}{result['peak_mb']:>18.2f}")
+        if "dataset_mb" in result:
+            print(f"{'  (공유 데이터셋 크기)':<28}{'':>12}{result['dataset_mb']:>18.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 데이터 준비 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="생성할 리포트 수 목록")
+    parser.add_argument('--rows-per-day', type=int, default=100, help="날짜 파티션 하나의 리포트 수")
+    parser.add_argument('--thumbnail-ratio', type=float, default=0.1, help="리포트 수 대비 미리보기 이미지 수")
+    parser.add_argument('--preview-all-limit', type=int, default=10000,
+                        help="이 건수 이하일 때만 전체 목록의 미리보기 경로 계산을 측정")
+    parser.add_argument('--apptest', action='store_true', help="Streamlit AppTest로 전체 화면 실행도 측정")
+    parser.add_argument('--apptest-timeout', type=float, default=600)
+    parser.add_argument('--output', help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument('--apptest-child', metavar='ROOT', help=argparse.SUPPRESS)  # run_apptest_isolated에서 사용
+    args = parser.parse_args()
+
+    if args.apptest_child:
+        results = []
+        measure(results, "apptest_full_run", run_apptest, args.apptest_child, args.apptest_timeout)
+        print(json.dumps(results[-1]))
+        return
+
+    report = {"date": date.today().isoformat(), "results": {}}
+    for rows in args.sizes:
+        results = benchmark_size(rows, args)
+        report["results"][str(rows)] = results
+        print_results(rows, results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 리포트 크롤링 대시보드 실행 스크립트
-대시보드와 스케줄러를 함께 실행합니다.
+대시보드와 스케줄러(필요하면 리포트 API 서버도)를 함께 실행합니다.
 """
 
 import subprocess
@@ -36,6 +36,16 @@ def run_scheduler():
     except Exception as e:
         print(f"❌ 스케줄러 실행 중 오류: {e}")
 
+def run_api():
+    """리포트 조회 API 서버 실행"""
+    try:
+        print("🔌 리포트 API 서버를 시작합니다...")
+        subprocess.run([sys.executable, "src/api.py", "--host", "0.0.0.0", "--port", "8502"])
+    except KeyboardInterrupt:
+        print("\n🛑 리포트 API 서버가 중지되었습니다.")
+    except Exception as e:
+        print(f"❌ API 서버 실행 중 오류: {e}")
+
 def main():
     """메인 함수"""
     print("=" * 50)
@@ -67,9 +77,10 @@ def main():
     print("1. 대시보드만 실행")
     print("2. 스케줄러만 실행")
     print("3. 대시보드 + 스케줄러 (권장)")
+    print("4. 대시보드 + 스케줄러 + 리포트 API")
     
     try:
-        choice = input("선택 (1-3): ").strip()
+        choice = input("선택 (1-4): ").strip()
     except KeyboardInterrupt:
         print("\n🛑 사용자가 중단했습니다.")
         return
@@ -90,6 +101,18 @@ def main():
         scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         scheduler_thread.start()
         
+        # 대시보드 실행
+        run_streamlit()
+    elif choice == "4":
+        print("🚀 대시보드, 스케줄러, 리포트 API를 함께 실행합니다...")
+        print("대시보드: http://localhost:8501")
+        print("리포트 API: http://localhost:8502/api/reports")
+        print("스케줄러: 백그라운드에서 실행")
+        print()
+        
+        threading.Thread(target=run_scheduler, daemon=True).start()
+        threading.Thread(target=run_api, daemon=True).start()
+        
         # 대시보드 실행
         run_streamlit()
     else:
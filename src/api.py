@@ -0,0 +1,397 @@
+"""
+리포트 조회 API (읽기 전용)
+
+수집된 리포트를 JSON으로 제공하는 가벼운 HTTP 서버입니다. 대시보드와 같은 DatasetService로 데이터를
+읽지만 별도 프로세스이므로 데이터 사본을 따로 가집니다. 크롤러가 새 리포트를 저장하면 이벤트 로그를 통해
+새 데이터 버전으로 바뀌고, 이전 버전의 응답 캐시는 버려집니다.
+
+엔드포인트
+- GET /api/reports                    리포트 목록 (필터, 커서 페이지네이션)
+    date_from, date_to: YYYY-MM-DD
+    broker, stock: 여러 번 지정 가능
+    q: 종목명/제목 검색어
+    sort: 작성일|조회수|종목명|증권사, order: desc|asc
+    fields: 반환할 컬럼 (쉼표 구분)
+    limit: 1~500 (기본 50), cursor: 이전 응답의 next_cursor
+    (커서는 마지막 행의 정렬 값과 리포트 키를 담으므로 그 사이에 새 리포트가 추가되어도 행이 중복/누락되지 않음)
+- GET /api/reports/<리포트ID>/thumbnail 첫 페이지 미리보기 이미지
+- GET /api/status                     스케줄러/크롤링 체크포인트/데이터 버전
+
+모든 응답에 ETag를 붙이고 If-None-Match가 같으면 304를 돌려줍니다.
+Accept-Encoding에 gzip이 있으면 본문을 압축합니다.
+
+사용법:
+    python src/api.py --host 0.0.0.0 --port 8502
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import report_dataset
+import report_query
+
+STATUS_PATH = 'logs/scheduler_status.json'
+CHECKPOINT_PATH = 'data/checkpoints/crawl.json'
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+CACHE_SIZE = 256
+GZIP_MIN_BYTES = 1024
+
+
+class BadRequest(Exception):
+    """잘못된 요청 파라미터"""
+
+
+class ResponseCache:
+    """데이터 버전별 응답 캐시 (버전이 바뀌면 전부 버림)"""
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.version = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, version, key):
+        with self.lock:
+            if version != self.version:
+                return None
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, version, key, entry):
+        with self.lock:
+            if version != self.version:
+                # 크롤러가 새 데이터를 저장하여 버전이 바뀌었으면 이전 응답은 모두 무효
+                self.version = version
+                self.entries.clear()
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def _cursor_value(value):
+    if pd.isna(value):
+        return None  # NaN은 JSON으로 쓸 수 없으므로 null (decode_cursor에서 다시 빈 값으로 비교)
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    if hasattr(value, 'item'):  # numpy 숫자
+        return value.item()
+    return value
+
+
+def encode_cursor(spec, row):
+    """마지막 행의 정렬 값과 리포트 키를 커서 문자열로 만듦"""
+    values = [_cursor_value(row[name]) for name in report_query.order_columns(spec)]
+    payload = {"sort": spec.sort_by, "asc": spec.ascending, "after": values}
+    return base64.urlsafe_b64encode(json.dumps(payload, ensure_ascii=False).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, spec):
+    """커서 문자열을 spec.after 값으로 변환 (정렬 조건이 다르면 BadRequest)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = payload["after"]
+        if payload["sort"] != spec.sort_by or payload["asc"] != spec.ascending:
+            raise BadRequest("cursor와 정렬 조건(sort, order)이 다릅니다.")
+        columns = report_query.order_columns(spec)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return tuple(
+            pd.Timestamp(value) if name == '작성일' and value is not None else value
+            for name, value in zip(columns, values)
+        )
+    except (ValueError, KeyError, TypeError):
+        raise BadRequest("잘못된 cursor입니다.")
+
+
+def _parse_date(params, name):
+    value = params.get(name, [None])[0]
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"{name}는 YYYY-MM-DD 형식이어야 합니다.")
+
+
+def parse_report_filter(params):
+    """쿼리 파라미터를 ReportFilter로 변환"""
+    sort_by = params.get('sort', ['작성일'])[0]
+    if sort_by not in report_query.SORT_COLUMNS:
+        raise BadRequest(f"sort는 {', '.join(report_query.SORT_COLUMNS)} 중 하나여야 합니다.")
+
+    order = params.get('order', ['desc'])[0]
+    if order not in ('desc', 'asc'):
+        raise BadRequest("order는 desc 또는 asc여야 합니다.")
+
+    try:
+        limit = int(params.get('limit', [DEFAULT_LIMIT])[0])
+    except ValueError:
+        raise BadRequest("limit은 정수여야 합니다.")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"limit은 1~{MAX_LIMIT} 사이여야 합니다.")
+
+    columns = None
+    if params.get('fields'):
+        columns = tuple(name for name in params['fields'][0].split(',') if name)
+        unknown = [name for name in columns if name not in report_query.REPORT_COLUMNS]
+        if unknown:
+            raise BadRequest(f"알 수 없는 필드: {', '.join(unknown)}")
+
+    spec = report_query.ReportFilter(
+        date_from=_parse_date(params, 'date_from'),
+        date_to=_parse_date(params, 'date_to'),
+        brokers=tuple(params.get('broker', [])),
+        stocks=tuple(params.get('stock', [])),
+        search=params.get('q', [''])[0],
+        sort_by=sort_by,
+        ascending=order == 'asc',
+        limit=limit,
+        columns=columns,
+        after=(),
+    )
+    cursor = params.get('cursor', [None])[0]
+    if cursor:
+        spec = replace(spec, after=decode_cursor(cursor, spec))
+    return spec
+
+
+def frame_to_records(frame):
+    """DataFrame을 JSON으로 보낼 수 있는 dict 목록으로 변환"""
+    if '작성일' in frame.columns and pd.api.types.is_datetime64_any_dtype(frame['작성일']):
+        frame = frame.assign(작성일=frame['작성일'].dt.strftime('%Y-%m-%d'))
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict('records')
+
+
+def build_report_index(dataset):
+    """리포트ID -> (파티션 날짜, 행 위치) (데이터 버전마다 한 번 만듦)"""
+    index = {}
+    for day in dataset.days:
+        frame = dataset.partition(day)
+        if '리포트ID' not in frame.columns:
+            continue
+        for position, report_id in enumerate(frame['리포트ID']):
+            if isinstance(report_id, str) and report_id:
+                index[report_id] = (day, position)
+    return index
+
+
+def thumbnail_path(report):
+    """크롤러가 저장한 리포트 첫 페이지 이미지 경로 (없으면 None)"""
+    safe_title = re.sub(r'[\\/*?:"<>|]', "", str(report['제목']))
+    path = f"data/images/{report['종목명']}_{safe_title}.jpg"
+    return path if os.path.exists(path) else None
+
+
+def load_json_file(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_scheduler_status():
+    return load_json_file(STATUS_PATH)
+
+
+class ReportsAPIHandler(BaseHTTPRequestHandler):
+    """읽기 전용 리포트 API 요청 처리"""
+
+    server_version = "ReportCrawlingAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        try:
+            if url.path == '/api/reports':
+                self.handle_reports(url, params)
+            elif url.path == '/api/status':
+                self.handle_status()
+            elif re.fullmatch(r'/api/reports/\d+/thumbnail', url.path):
+                self.handle_thumbnail(url.path.split('/')[3])
+            else:
+                self.send_json({"error": "찾을 수 없는 경로입니다."}, status=404)
+        except BadRequest as e:
+            self.send_json({"error": str(e)}, status=400)
+        except Exception as e:
+            self.log_error("요청 처리 중 오류: %s", e)
+            self.send_json({"error": "서버 오류가 발생했습니다."}, status=500)
+
+    def handle_reports(self, url, params):
+        dataset = self.server.service.current()
+        # 같은 버전, 같은 쿼리면 캐시된 응답을 그대로 사용
+        cache_key = (url.path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        entry = self.server.cache.get(dataset.version, cache_key)
+        if entry is None:
+            spec = parse_report_filter(params)
+            # 커서를 만들 수 있도록 정렬/리포트 키 컬럼을 함께 조회하고 응답에서는 제외
+            output_columns = list(spec.columns or report_query.REPORT_COLUMNS)
+            order_columns = report_query.order_columns(spec)
+            # 다음 페이지가 있는지 알 수 있도록 한 행 더 조회
+            result = dataset.query(replace(spec, limit=spec.limit + 1, columns=tuple(
+                output_columns + [name for name in order_columns if name not in output_columns]
+            )))
+            has_more = len(result.frame) > spec.limit
+            frame = result.frame.iloc[:spec.limit]
+            payload = {
+                "items": frame_to_records(frame[output_columns]),
+                "total": result.total,
+                "next_cursor": encode_cursor(spec, frame.iloc[-1]) if has_more else None,
+                "version": dataset.version,
+            }
+            entry = self.build_entry(json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+            self.server.cache.put(dataset.version, cache_key, entry)
+        self.send_entry(entry)
+
+    def handle_status(self):
+        dataset = self.server.service.current()
+        days = dataset.days
+        payload = {
+            "scheduler": dataset.scheduler_status or load_scheduler_status(),
+            "checkpoint": load_json_file(CHECKPOINT_PATH),
+            "dataset": {
+                "version": dataset.version,
+                "created_at": dataset.created_at.isoformat(),
+                "partitions": len(days),
+                "first_date": days[0].isoformat() if days else None,
+                "last_date": days[-1].isoformat() if days else None,
+            },
+        }
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_entry(self.build_entry(body, 'application/json; charset=utf-8'))
+
+    def handle_thumbnail(self, report_id):
+        dataset = self.server.service.current()
+        location = self.server.report_index(dataset).get(report_id)
+        path = None
+        if location is not None:
+            day, position = location
+            frame = dataset.partition(day)
+            if position < len(frame):  # 파티션 파일을 읽지 못하면 빈 프레임
+                path = thumbnail_path(frame.iloc[position])
+        if not path:
+            self.send_json({"error": "미리보기 이미지가 없습니다."}, status=404)
+            return
+
+        stat = os.stat(path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_not_modified(etag)
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        # JPEG는 이미 압축되어 있으므로 gzip을 적용하지 않음
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'max-age=3600')
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def build_entry(body, content_type):
+        """응답 본문과 ETag, gzip 압축본을 한 번만 만들어 둠"""
+        return {
+            "body": body,
+            "gzip": gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None,
+            "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+            "content_type": content_type,
+        }
+
+    def send_entry(self, entry, status=200):
+        if self.headers.get('If-None-Match') == entry["etag"]:
+            self.send_not_modified(entry["etag"])
+            return
+
+        body = entry["body"]
+        use_gzip = entry["gzip"] is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            body = entry["gzip"]
+
+        self.send_response(status)
+        self.send_header('Content-Type', entry["content_type"])
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', entry["etag"])
+        self.send_header('Cache-Control', 'no-cache')  # 매번 ETag로 재검증
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.end_headers()
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_entry(self.build_entry(body, 'application/json; charset=utf-8'), status=status)
+
+
+class ReportsAPIServer(ThreadingHTTPServer):
+    """데이터셋 서비스, 응답 캐시, 리포트ID 색인을 가진 API 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, ReportsAPIHandler)
+        self.service = service
+        self.cache = ResponseCache()
+        self._index = (None, {})  # (데이터 버전, 리포트ID 색인)
+        self._index_lock = threading.Lock()
+
+    def report_index(self, dataset):
+        """dataset 버전의 리포트ID 색인 (버전이 바뀌었을 때만 다시 만듦)"""
+        with self._index_lock:
+            if self._index[0] != dataset.version:
+                self._index = (dataset.version, build_report_index(dataset))
+            return self._index[1]
+
+
+def create_server(host='127.0.0.1', port=8502, service=None):
+    """API 서버를 만듦 (service를 생략하면 이 프로세스용 데이터셋 서비스를 새로 시작)"""
+    service = service or report_dataset.DatasetService(status_loader=load_scheduler_status).start()
+    return ReportsAPIServer((host, port), service)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리포트 조회 API 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port)
+    print(f"리포트 API 시작: http://{args.host}:{args.port}/api/reports ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n리포트 API가 중지되었습니다.")
+    finally:
+        server.service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
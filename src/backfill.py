@@ -0,0 +1,277 @@
+"""
+과거 리포트 백필
+
+날짜 범위를 받아 그 범위가 들어 있는 목록 페이지 구간을 이진 탐색으로 찾고, 구간을 여러 샤드로
+나누어 병렬로 수집합니다. 네트워크 요청은 크롤러의 HTTP 캐시가 가진 전역 요청 간격을 따르며,
+수집한 리포트는 작성일별 CSV(data/csv/research_reports_YYYYMMDD.csv)에 중복 없이 추가합니다.
+과거 페이지는 다시 읽을 일이 없으므로 디스크 캐시에 저장하지 않습니다. (replay 모드는 그대로 사용)
+
+수집하는 동안 새 리포트가 올라오면 기존 행은 뒤쪽 페이지로 밀립니다. 시작할 때 첫 페이지의 맨 위 리포트를
+기억해 두고, 끝난 뒤 그 사이에 올라온 리포트 수만큼 각 샤드 경계 뒤의 페이지를 다시 읽으며,
+마지막 샤드 뒤는 날짜 범위를 벗어날 때까지 이어서 읽습니다.
+
+사용법:
+    python src/backfill.py --start 2024-01-01 --end 2024-12-31 --workers 4
+    python src/backfill.py --start 2025-08-01 --end 2025-08-19 --attachments
+"""
+
+import argparse
+import math
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+
+import crawler
+from events import NEW_REPORTS, publish_event
+
+MAX_PAGE = 100000  # 목록 페이지 탐색 상한
+SHARD_PAGES = 20
+SHARD_OVERLAP = 1  # 수집 중 새 리포트가 올라와 행이 밀려도 샤드 경계에서 놓치지 않도록 겹쳐 읽는 페이지 수
+REPORT_KEY_DATE = crawler.REPORT_KEY.index('작성일')  # 리포트 키에서 작성일 위치
+
+
+def parse_report_date(value):
+    """'25.08.19' 형식의 작성일을 date로 변환 (형식이 다르면 None)"""
+    try:
+        return datetime.strptime(value, '%y.%m.%d').date()
+    except ValueError:
+        return None
+
+
+def page_date_span(page):
+    """페이지 행들의 (가장 최근 작성일, 가장 오래된 작성일). 빈 페이지면 None"""
+    dates = [d for d in (parse_report_date(row['작성일']) for row in crawler.load_report_rows(page)) if d]
+    if not dates:
+        return None
+    return max(dates), min(dates)
+
+
+def first_page_where(predicate, max_page=MAX_PAGE):
+    """predicate(page)가 처음 True가 되는 페이지를 찾음 (페이지 번호에 대해 단조라고 가정)
+
+    1, 2, 4, 8... 로 상한을 찾은 뒤 그 사이를 이진 탐색합니다.
+    """
+    if predicate(1):
+        return 1
+    lo, hi = 1, 2
+    while hi < max_page and not predicate(hi):
+        lo, hi = hi, min(hi * 2, max_page)
+    # predicate(lo)는 False, predicate(hi)는 True (또는 상한)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def find_page_span(start, end, max_page=MAX_PAGE):
+    """start~end 작성일의 리포트가 들어 있는 (첫 페이지, 마지막 페이지). 없으면 None
+
+    목록은 최신순이므로 페이지가 뒤로 갈수록 작성일이 같거나 이전입니다.
+    빈 페이지(목록 끝 이후)는 가장 오래된 날짜로 취급합니다.
+    """
+    def span(page):
+        return page_date_span(page) or (date.min, date.min)
+
+    # 가장 오래된 행이 end 이하인 첫 페이지
+    first = first_page_where(lambda page: span(page)[1] <= end, max_page)
+    # 가장 최근 행도 start보다 이전인 첫 페이지의 바로 앞 페이지
+    last = first_page_where(lambda page: span(page)[0] < start, max_page) - 1
+
+    if last < first:
+        return None
+    return first, last
+
+
+def split_shards(first, last, shard_pages=SHARD_PAGES):
+    """페이지 구간을 샤드 목록 [(시작, 끝), ...]으로 나눔"""
+    return [(page, min(page + shard_pages - 1, last)) for page in range(first, last + 1, shard_pages)]
+
+
+class PartitionWriter:
+    """여러 샤드가 수집한 리포트를 작성일별 CSV에 중복 없이 추가"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.known = {}  # 파일명 -> 저장된 리포트 키 집합
+        self.saved = 0
+
+    def write(self, reports):
+        """새로 저장한 리포트 목록을 반환"""
+        by_file = defaultdict(list)
+        for report in reports:
+            by_file[crawler.partition_filename(parse_report_date(report['작성일']))].append(report)
+
+        saved = []
+        with self.lock:
+            for filename, rows in sorted(by_file.items()):
+                if filename not in self.known:
+                    self.known[filename] = crawler.load_report_keys(filename)
+                known = self.known[filename]
+
+                new_rows = []
+                for row in rows:
+                    if crawler.report_key(row) not in known:
+                        known.add(crawler.report_key(row))
+                        new_rows.append(row)
+                if new_rows:
+                    crawler.append_reports(filename, new_rows)
+                    publish_event(NEW_REPORTS, {"file": filename, "reports": new_rows})
+                    saved.extend(new_rows)
+            self.saved += len(saved)
+        return saved
+
+
+def rows_in_range(rows, start, end):
+    """작성일이 start~end인 행"""
+    reports = []
+    for row in rows:
+        day = parse_report_date(row['작성일'])
+        if day and start <= day <= end:
+            reports.append(row)
+    return reports
+
+
+def crawl_pages(pages, start, end, writer):
+    """페이지들을 읽어 날짜 범위의 리포트를 저장하고, 저장한 리포트를 반환"""
+    saved = []
+    for page in pages:
+        # 페이지 단위로 바로 저장하여 중간에 종료되어도 수집한 행은 남김
+        saved.extend(writer.write(rows_in_range(crawler.load_report_rows(page), start, end)))
+    return saved
+
+
+def crawl_shard(shard, start, end, writer):
+    """샤드의 페이지(와 다음 샤드와 겹치는 페이지)를 수집"""
+    first, last = shard
+    return crawl_pages(range(first, last + SHARD_OVERLAP + 1), start, end, writer)
+
+
+def head_key():
+    """목록 맨 위 리포트의 키 (목록이 비어 있으면 None)"""
+    rows = crawler.load_report_rows(1)
+    return crawler.report_key(rows[0]) if rows else None
+
+
+def count_new_rows(key, max_page=MAX_PAGE):
+    """key 리포트 앞에 새로 올라온 리포트 수와 페이지당 행 수
+
+    key 리포트가 삭제되거나 제목이 바뀌어 찾을 수 없으면 그 작성일보다 이전 행이 나올 때까지만 셉니다.
+    """
+    key_date = parse_report_date(key[REPORT_KEY_DATE])
+    rows_per_page = 0
+    count = 0
+    for page in range(1, max_page + 1):
+        rows = crawler.load_report_rows(page)
+        if not rows:
+            break
+        rows_per_page = max(rows_per_page, len(rows))
+        for row in rows:
+            if crawler.report_key(row) == key:
+                return count, rows_per_page
+            day = parse_report_date(row['작성일'])
+            if key_date and day and day < key_date:
+                return count, rows_per_page
+            count += 1
+    return count, rows_per_page
+
+
+def recheck_tail(page, start, end, writer, max_page=MAX_PAGE):
+    """page부터 행이 모두 start 이전이 될 때까지 읽으며 날짜 범위의 리포트를 저장"""
+    saved = []
+    while page <= max_page:
+        rows = crawler.load_report_rows(page)  # 캐시를 쓰지 않으므로 페이지마다 한 번만 읽음
+        dates = [d for d in (parse_report_date(row['작성일']) for row in rows) if d]
+        if not dates:
+            break
+        saved.extend(writer.write(rows_in_range(rows, start, end)))
+        if max(dates) < start:
+            break
+        page += 1
+    return saved
+
+
+def download_attachments(reports, workers):
+    """첨부 PDF를 병렬로 내려받음 (요청 간격은 크롤러와 같은 전역 제한을 따름)"""
+    def download(report):
+        crawler.http_cache.throttle()
+        crawler.download_attachment(report)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in as_completed([executor.submit(download, report) for report in reports if report['첨부']]):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"첨부 처리 실패: {e}")
+
+
+def backfill(start, end, workers=4, attachments=False, shard_pages=SHARD_PAGES):
+    """start~end 작성일의 리포트를 수집하고 저장한 건수를 반환"""
+    span = find_page_span(start, end)
+    if span is None:
+        print(f"{start} ~ {end} 기간의 리포트가 없습니다.")
+        return 0
+
+    shards = split_shards(*span, shard_pages=shard_pages)
+    print(f"페이지 {span[0]} ~ {span[1]}을 {len(shards)}개 샤드로 나누어 수집합니다. (작업자 {workers}개)")
+
+    writer = PartitionWriter()
+    saved = []
+    started_at = head_key()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(crawl_shard, shard, start, end, writer): shard for shard in shards}
+        for done, future in enumerate(as_completed(futures), 1):
+            shard = futures[future]
+            try:
+                saved.extend(future.result())
+                print(f"[{done}/{len(shards)}] 페이지 {shard[0]} ~ {shard[1]} 완료 (누적 {writer.saved}건)")
+            except Exception as e:
+                print(f"[{done}/{len(shards)}] 페이지 {shard[0]} ~ {shard[1]} 실패: {e}")
+
+    # 수집하는 동안 밀린 행을 놓치지 않도록 샤드 경계 뒤와 마지막 페이지 뒤를 다시 확인
+    new_rows, rows_per_page = count_new_rows(started_at) if started_at else (0, 0)
+    shifted_pages = math.ceil(new_rows / rows_per_page) if rows_per_page else 0
+    if shifted_pages > SHARD_OVERLAP:
+        print(f"수집 중 새 리포트 {new_rows}건이 올라와 샤드 경계 뒤 {shifted_pages}페이지를 다시 확인합니다.")
+        for _, last in shards[:-1]:
+            saved.extend(crawl_pages(range(last + SHARD_OVERLAP + 1, last + shifted_pages + 1), start, end, writer))
+    saved.extend(recheck_tail(shards[-1][1] + SHARD_OVERLAP + 1, start, end, writer))
+
+    if attachments:
+        download_attachments(saved, workers)
+
+    print(f"HTTP 캐시: {crawler.http_cache.stats}")
+    return writer.saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="과거 리포트 백필")
+    parser.add_argument('--start', required=True, type=date.fromisoformat, help="시작 작성일 (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat, default=date.today(), help="끝 작성일 (YYYY-MM-DD, 기본: 오늘)")
+    parser.add_argument('--workers', type=int, default=4, help="병렬 샤드 수")
+    parser.add_argument('--shard-pages', type=int, default=SHARD_PAGES, help="샤드 하나의 페이지 수")
+    parser.add_argument('--rate', type=float, default=1.0, help="초당 최대 네트워크 요청 수 (전체 작업자 합계)")
+    parser.add_argument('--attachments', action='store_true', help="첨부 PDF와 첫 페이지 이미지도 수집")
+    args = parser.parse_args()
+
+    if args.start > args.end:
+        parser.error("--start는 --end보다 이후일 수 없습니다.")
+    if args.rate <= 0:
+        parser.error("--rate는 0보다 커야 합니다.")
+
+    crawler.http_cache.min_interval = 1 / args.rate
+    if crawler.http_cache.mode == 'network':
+        crawler.http_cache.mode = 'off'  # 과거 페이지는 다시 읽지 않으므로 data/cache에 남기지 않음
+
+    print(f"백필 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ({args.start} ~ {args.end})")
+    count = backfill(args.start, args.end, workers=args.workers,
+                     attachments=args.attachments, shard_pages=args.shard_pages)
+    print(f"\n백필 완료: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"총 {count}개의 리포트를 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,15 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
-import time
 import os
+import csv
+import json
 from pdf2image import convert_from_path
 import re
 
+from events import NEW_REPORTS, publish_event
+from http_cache import HttpCache
+
 def download_pdf(url, filename):
     """PDF 파일을 다운로드하는 함수"""
     try:
@@ -35,16 +39,19 @@ def convert_first_page_to_image(pdf_path, image_path):
         print(f"이미지 변환 실패: {e}")
     return False
 
-def get_research_reports(page=1):
+# 목록 페이지 파싱 결과의 형식이 바뀌면 올려서 이전 파싱 캐시를 무효화
+PARSER_VERSION = 2
+
+http_cache = HttpCache(min_interval=1)  # 서버 부하 방지를 위한 딜레이 (캐시 응답에는 적용 안 됨)
+
+def fetch_list_page(page):
+    """리포트 목록 페이지를 HTTP 캐시를 거쳐 가져오는 함수"""
     url = f"https://finance.naver.com/research/company_list.naver?&page={page}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    
-    response = requests.get(url, headers=headers)
-    response.encoding = 'euc-kr'  # 한글 인코딩 처리
-    
-    soup = BeautifulSoup(response.text, 'lxml')
+    return http_cache.get(url, encoding='euc-kr')  # 한글 인코딩 처리
+
+def parse_report_rows(html):
+    """목록 페이지 HTML에서 리포트 행을 추출하는 함수"""
+    soup = BeautifulSoup(html, 'lxml')
     
     # 테이블 찾기 (여러 클래스 시도)
     table = soup.find('table', {'class': 'type_1'})
@@ -56,84 +63,228 @@ def get_research_reports(page=1):
     if not table:
         return []
     
-    reports = []
-    rows = table.find_all('tr')[1:]  # 헤더 제외
-    today = datetime.now().strftime('%y.%m.%d')  # 오늘 날짜 형식 (예: 24.03.21)
+    rows = []
+    for row in table.find_all('tr')[1:]:  # 헤더 제외
+        cols = row.find_all('td')
+        if len(cols) >= 6:
+            # 첨부 파일 링크 추출
+            attachment_link = ""
+            attachment_anchor = cols[3].find('a')
+            if attachment_anchor:
+                href = attachment_anchor['href']
+                if href.startswith('//'):
+                    attachment_link = "https:" + href
+                else:
+                    attachment_link = href
+            
+            # 제목 링크의 nid (리포트 고유 번호)
+            report_id = ""
+            title_anchor = cols[1].find('a')
+            if title_anchor:
+                match = re.search(r'nid=(\d+)', title_anchor.get('href', ''))
+                if match:
+                    report_id = match.group(1)
+            
+            rows.append({
+                '종목명': cols[0].text.strip(),
+                '제목': cols[1].text.strip(),
+                '증권사': cols[2].text.strip(),
+                '첨부': attachment_link,
+                '작성일': cols[4].text.strip(),
+                '조회수': cols[5].text.strip(),
+                '리포트ID': report_id
+            })
+    return rows
+
+def load_report_rows(page):
+    """목록 페이지의 리포트 행을 반환하는 함수 (본문이 같으면 이전 파싱 결과 재사용)"""
+    response = fetch_list_page(page)
+    rows = http_cache.get_parsed(response.url, response.digest, PARSER_VERSION)
+    if rows is None:
+        rows = parse_report_rows(response.text)
+        http_cache.put_parsed(response.url, response.digest, PARSER_VERSION, rows)
+    return rows
+
+def download_attachment(report):
+    """리포트 첨부 PDF를 다운로드하고 첫 페이지를 이미지로 변환하는 함수 (이미지까지 만들었으면 True)"""
+    # 파일명 생성 (종목명_제목.pdf)
+    safe_title = re.sub(r'[\\/*?:"<>|]', "", report['제목'])  # 파일명에 사용할 수 없는 문자 제거
+    pdf_filename = f"data/pdfs/{report['종목명']}_{safe_title}.pdf"
+    image_filename = f"data/images/{report['종목명']}_{safe_title}.jpg"
+    
+    # 이전 실행에서 이미 처리된 첨부는 건너뜀
+    if os.path.exists(image_filename):
+        return True
     
     # 폴더 생성
     os.makedirs('data/pdfs', exist_ok=True)
     os.makedirs('data/images', exist_ok=True)
     
-    for row in rows:
-        cols = row.find_all('td')
-        if len(cols) >= 6:
-            date = cols[4].text.strip()
-            
-            # 오늘 날짜의 리포트만 수집
-            if date == today:
-                stock_name = cols[0].text.strip()
-                title = cols[1].text.strip()
-                company = cols[2].text.strip()
-                
-                # 첨부 파일 링크 추출
-                attachment_link = ""
-                attachment_cell = cols[3]
-                if attachment_cell.find('a'):
-                    href = attachment_cell.find('a')['href']
-                    if href.startswith('//'):
-                        attachment_link = "https:" + href
-                    else:
-                        attachment_link = href
-                    
-                    # 파일명 생성 (종목명_제목.pdf)
-                    safe_title = re.sub(r'[\\/*?:"<>|]', "", title)  # 파일명에 사용할 수 없는 문자 제거
-                    pdf_filename = f"data/pdfs/{stock_name}_{safe_title}.pdf"
-                    image_filename = f"data/images/{stock_name}_{safe_title}.jpg"
-                    
-                    # PDF 다운로드 및 첫 페이지 이미지 변환
-                    if download_pdf(attachment_link, pdf_filename):
-                        print(f"PDF 다운로드 완료: {pdf_filename}")
-                        if convert_first_page_to_image(pdf_filename, image_filename):
-                            print(f"이미지 변환 완료: {image_filename}")
-                
-                views = cols[5].text.strip()
-                
-                reports.append({
-                    '종목명': stock_name,
-                    '제목': title,
-                    '증권사': company,
-                    '첨부': attachment_link,
-                    '작성일': date,
-                    '조회수': views
-                })
-            elif date < today:  # 오늘보다 이전 날짜가 나오면 더 이상 검색할 필요 없음
-                return reports
+    # PDF 다운로드 및 첫 페이지 이미지 변환
+    if download_pdf(report['첨부'], pdf_filename):
+        print(f"PDF 다운로드 완료: {pdf_filename}")
+        if convert_first_page_to_image(pdf_filename, image_filename):
+            print(f"이미지 변환 완료: {image_filename}")
+            return True
+    return False
+
+def get_research_reports(page=1):
+    """목록 페이지에서 오늘 날짜의 리포트만 반환하는 함수 (첨부는 main에서 따로 처리)"""
+    reports = []
+    today = datetime.now().strftime('%y.%m.%d')  # 오늘 날짜 형식 (예: 24.03.21)
+    
+    for report in load_report_rows(page):
+        date = report['작성일']
+        
+        # 오늘 날짜의 리포트만 수집
+        if date == today:
+            reports.append(report)
+        elif date < today:  # 오늘보다 이전 날짜가 나오면 더 이상 검색할 필요 없음
+            return reports
     
     return reports
 
-def main():
-    all_reports = []
-    page = 1
+# 같은 리포트인지 판단하는 컬럼
+REPORT_KEY = ['종목명', '제목', '증권사', '작성일']
+REPORT_COLUMNS = ['종목명', '제목', '증권사', '첨부', '작성일', '조회수', '리포트ID']
+
+CHECKPOINT_PATH = 'data/checkpoints/crawl.json'
+MAX_ATTACHMENT_RETRIES = 3  # 실패한 첨부는 이 횟수만큼 다음 실행에서 다시 시도
+
+def report_key(report):
+    return tuple(report[key] for key in REPORT_KEY)
+
+def partition_filename(day):
+    """작성일(date)별 CSV 파일 경로"""
+    return f"data/csv/research_reports_{day.strftime('%Y%m%d')}.csv"
+
+def load_report_keys(filename):
+    """CSV에 이미 저장된 리포트의 키 집합을 반환하는 함수"""
+    if not os.path.exists(filename):
+        return set()
+    try:
+        existing = pd.read_csv(filename, dtype=str, usecols=REPORT_KEY, encoding='utf-8-sig')
+    except (ValueError, pd.errors.EmptyDataError):
+        return set()
+    return set(existing.itertuples(index=False, name=None))
+
+def append_reports(filename, reports):
+    """리포트를 CSV 끝에 추가하고 디스크에 기록될 때까지 기다리는 함수"""
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    
+    # 기존 파일의 컬럼 순서를 따름 (새 파일이면 헤더 작성)
+    fieldnames = None
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        with open(filename, 'r', encoding='utf-8-sig', newline='') as f:
+            fieldnames = next(csv.reader(f), None)
+    
+    with open(filename, 'a', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames or REPORT_COLUMNS, extrasaction='ignore')
+        if not fieldnames:
+            writer.writeheader()
+        writer.writerows(reports)
+        f.flush()
+        os.fsync(f.fileno())
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """저장된 체크포인트를 반환 (없으면 None)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_PATH):
+    """체크포인트를 임시 파일에 쓴 뒤 교체하여 중간에 종료되어도 깨지지 않도록 저장"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    checkpoint["updated_at"] = datetime.now().isoformat()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def start_checkpoint(day):
+    """오늘 실행할 체크포인트를 준비하는 함수
+
+    체크포인트는 날짜별로 유지됩니다. 같은 날짜의 이전 실행이 중간에 끝났으면 이어서 진행하고,
+    날짜가 바뀌면 목록 진행 상황은 처음부터 시작하되 남은 첨부 작업은 넘겨받습니다.
+    """
+    previous = load_checkpoint()
+    if previous and previous["date"] == day:
+        if previous["status"] == "running":
+            print(f"이전 실행 이어서 진행: {previous['pages_done']}페이지 완료, "
+                  f"{previous['rows_persisted']}건 저장, 첨부 {len(previous['pending_attachments'])}건 대기")
+        previous["status"] = "running"
+        return previous
     
+    return {
+        "date": day,
+        "status": "running",
+        "pages_done": 0,
+        "rows_persisted": 0,
+        "pending_attachments": previous["pending_attachments"] if previous else [],
+    }
+
+def main():
     print(f"크롤링 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
+    filename = partition_filename(datetime.now())
+    checkpoint = start_checkpoint(datetime.now().strftime('%Y%m%d'))
+    resume_after = checkpoint["pages_done"]
+    known = load_report_keys(filename)
+    saved_count = 0
+    page = 1
+    
     while True:
         reports = get_research_reports(page)
         
         if not reports:
             break
-            
-        all_reports.extend(reports)
+        
+        new_reports = []
+        for report in reports:
+            if report_key(report) not in known:
+                known.add(report_key(report))
+                new_reports.append(report)
+        
+        # 페이지마다 새 리포트를 바로 저장하여 중간에 종료되어도 수집한 행은 남김
+        if new_reports:
+            append_reports(filename, new_reports)
+            # 대시보드가 변경분만 반영할 수 있도록 새 리포트 이벤트 발행
+            publish_event(NEW_REPORTS, {"file": filename, "reports": new_reports})
+            saved_count += len(new_reports)
+        
+        checkpoint["pages_done"] = max(checkpoint["pages_done"], page)
+        checkpoint["rows_persisted"] += len(new_reports)
+        checkpoint["pending_attachments"].extend(report for report in new_reports if report['첨부'])
+        save_checkpoint(checkpoint)
+        
+        # 앞쪽 페이지에 새 리포트가 더 없으면 오늘 이전 실행에서 끝낸 페이지는 건너뜀
+        # (새 리포트가 올라오면 기존 행은 뒤쪽 페이지로 밀리므로 놓치는 행은 없음)
+        if not new_reports and page < resume_after:
+            page = resume_after
         page += 1
-        time.sleep(1)  # 서버 부하 방지를 위한 딜레이
     
-    # DataFrame 생성 및 저장
-    df = pd.DataFrame(all_reports)
-    os.makedirs('data/csv', exist_ok=True)
-    filename = f"data/csv/research_reports_{datetime.now().strftime('%Y%m%d')}.csv"
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
+    print(f"HTTP 캐시: {http_cache.stats}")
+    
+    # 첨부 PDF 처리 (하나씩 끝날 때마다 체크포인트에서 제거, 실패하면 맨 뒤로 옮겨 다음 실행에서 재시도)
+    for _ in range(len(checkpoint["pending_attachments"])):
+        report = checkpoint["pending_attachments"].pop(0)
+        if not download_attachment(report):
+            report["retries"] = report.get("retries", 0) + 1
+            if report["retries"] < MAX_ATTACHMENT_RETRIES:
+                checkpoint["pending_attachments"].append(report)
+            else:
+                print(f"첨부 처리 {MAX_ATTACHMENT_RETRIES}회 실패로 제외: {report['종목명']} - {report['제목']}")
+        save_checkpoint(checkpoint)
+    
+    checkpoint["status"] = "complete"
+    save_checkpoint(checkpoint)
+    
     print(f"\n크롤링 완료: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"총 {len(all_reports)}개의 오늘자 리포트를 {filename}에 저장했습니다.")
+    print(f"새 리포트 {saved_count}개를 {filename}에 저장했습니다. (오늘자 누적 {len(known)}개)")
 
 if __name__ == "__main__":
     main() 
@@ -1,12 +1,16 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import os
-import glob
+from dataclasses import replace
 import json
 
+import dashboard_data
+import report_dataset
+import report_query
+import view_tracker
+
 # 페이지 설정
 st.set_page_config(
     page_title="리포트 크롤링 대시보드",
@@ -19,12 +23,14 @@ st.set_page_config(
 st.title("📊 리포트 크롤링 대시보드")
 st.markdown("네이버 금융 종목분석 리포트 수집 현황을 실시간으로 모니터링합니다.")
 
+# 목록 한 페이지에 표시할 리포트 수
+PAGE_SIZE = 50
+
 # 사이드바
 st.sidebar.header("🔧 설정")
 st.sidebar.markdown("### 필터 옵션")
 
 # 스케줄러 상태 로드 함수
-@st.cache_data(ttl=60)  # 1분마다 캐시 갱신
 def load_scheduler_status():
     """스케줄러 상태를 로드합니다."""
     try:
@@ -36,53 +42,58 @@ def load_scheduler_status():
         st.error(f"스케줄러 상태 로드 실패: {e}")
         return None
 
-# 데이터 로드 함수
+# 조회수 추이 로드 함수
 @st.cache_data
-def load_data():
-    """CSV 파일에서 데이터를 로드합니다."""
-    try:
-        # CSV 파일 찾기
-        csv_files = glob.glob("data/csv/*.csv")
-        if not csv_files:
-            st.error("CSV 파일을 찾을 수 없습니다.")
-            return None
-        
-        # 가장 최근 파일 선택
-        latest_file = max(csv_files, key=os.path.getctime)
-        df = pd.read_csv(latest_file)
-        
-        # 날짜 컬럼 처리
-        if '작성일' in df.columns:
-            df['작성일'] = pd.to_datetime(df['작성일'], format='%y.%m.%d', errors='coerce')
-        
-        return df, latest_file
-    except Exception as e:
-        st.error(f"데이터 로드 중 오류 발생: {e}")
-        return None, None
+def load_view_history(mtime):
+    """조회수 레코드와 리포트 메타 정보를 로드합니다. (저장소 파일이 바뀌면 다시 로드)"""
+    return view_tracker.load_records(), view_tracker.load_meta()
 
-# 데이터 로드
-df, filename = load_data()
+# 세션 간 공유 데이터
+@st.cache_resource
+def get_dataset_service():
+    """프로세스 전체가 공유하는 데이터셋 (백그라운드에서 새 이벤트를 반영한 버전으로 교체)"""
+    return report_dataset.DatasetService(status_loader=load_scheduler_status).start()
 
-if df is not None:
-    st.sidebar.success(f"📁 로드된 파일: {filename}")
+@st.fragment(run_every=10)
+def watch_events():
+    """공유 데이터셋이 새 버전으로 바뀌었으면 화면을 다시 그립니다."""
+    if get_dataset_service().current().version != st.session_state.get("data_version"):
+        st.rerun()
+
+# 데이터 로드 (이번 실행 동안은 같은 버전을 사용)
+dataset = get_dataset_service().current()
+st.session_state["data_version"] = dataset.version
+partition_days = dataset.days
+
+if partition_days:
+    st.sidebar.success(f"📁 로드된 파티션: {len(partition_days)}개 ({partition_days[0]} ~ {partition_days[-1]})")
     
     # 필터 옵션 (스케줄러 상태 위로 이동)
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📅 날짜 필터")
-    if '작성일' in df.columns:
-        date_range = st.sidebar.date_input(
-            "날짜 범위 선택",
-            value=(df['작성일'].min().date(), df['작성일'].max().date()),
-            min_value=df['작성일'].min().date(),
-            max_value=df['작성일'].max().date()
-        )
+    date_range = st.sidebar.date_input(
+        "날짜 범위 선택",
+        value=(partition_days[-1], partition_days[-1]),  # 기본은 가장 최근 날짜
+        min_value=partition_days[0],
+        max_value=partition_days[-1]
+    )
+    # 시작일만 선택한 상태에서는 그 날짜 하루로 조회
+    date_from = date_range[0] if date_range else None
+    date_to = date_range[-1] if date_range else None
+    
+    # 선택한 날짜 범위의 통계/차트용 데이터 (필요한 컬럼만)
+    df = dataset.query(report_query.ReportFilter(
+        date_from=date_from,
+        date_to=date_to,
+        columns=('증권사', '조회수', '첨부')
+    )).frame
     
     st.sidebar.markdown("### 🏢 증권사 필터")
     all_companies = ["전체"] + sorted(df['증권사'].unique().tolist())
     selected_company = st.sidebar.selectbox("증권사 선택", all_companies)
     
-    # 스케줄러 상태 로드
-    scheduler_status = load_scheduler_status()
+    # 스케줄러 상태 (이벤트로 갱신됨)
+    scheduler_status = dataset.scheduler_status
     
     # 스케줄러 상태 표시 (필터 아래로 이동)
     if scheduler_status:
@@ -129,7 +140,7 @@ if df is not None:
         )
     
     with col3:
-        avg_views = int(df['조회수'].mean())
+        avg_views = int(df['조회수'].mean()) if df['조회수'].notna().any() else 0
         st.metric(
             label="👀 평균 조회수",
             value=f"{avg_views:,}",
@@ -144,80 +155,49 @@ if df is not None:
             delta=f"+{pdf_count} 건"
         )
     
-    # 데이터 필터링
-    filtered_df = df.copy()
-    if selected_company != "전체":
-        filtered_df = filtered_df[filtered_df['증권사'] == selected_company]
-    
     # 2. 수집된 리포트 목록 & PDF 다운로드
     st.markdown("---")
     st.subheader("📋 수집된 리포트 목록")
     
     # 검색 기능
     search_term = st.text_input("🔍 종목명 또는 제목으로 검색")
-    if search_term:
-        filtered_df = filtered_df[
-            filtered_df['종목명'].str.contains(search_term, case=False, na=False) |
-            filtered_df['제목'].str.contains(search_term, case=False, na=False)
-        ]
     
     # 정렬 옵션
     col1, col2 = st.columns(2)
     with col1:
-        sort_by = st.selectbox("정렬 기준", ["작성일", "조회수", "종목명", "증권사"])
+        sort_by = st.selectbox("정렬 기준", report_query.SORT_COLUMNS)
     with col2:
         sort_order = st.selectbox("정렬 순서", ["내림차순", "오름차순"])
     
-    if sort_order == "내림차순":
-        filtered_df = filtered_df.sort_values(sort_by, ascending=False)
-    else:
-        filtered_df = filtered_df.sort_values(sort_by, ascending=True)
-    
-    # 미리보기 이미지 경로 생성 함수
-    def get_preview_image_path(row):
-        """리포트의 미리보기 이미지 경로를 생성합니다."""
-        if pd.notna(row['첨부']) and row['첨부'] != "":
-            # 종목명으로 이미지 파일 찾기
-            import glob
-            
-            # first_page 폴더에서 해당 종목의 이미지 파일 찾기
-            pattern = f"data/images/first_page/{row['종목명']}_*.jpg"
-            matching_files = glob.glob(pattern)
-            
-            if matching_files:
-                # 첫 번째 매칭 파일 반환
-                return matching_files[0]
-                    
-        return None
-    
-    # PDF 다운로드 링크와 미리보기를 포함한 데이터프레임 생성
-    display_df = filtered_df.copy()
-    
-    # 미리보기 컬럼 추가
-    display_df['미리보기'] = display_df.apply(get_preview_image_path, axis=1)
-    
-    # 다운로드 컬럼에 실제 URL 포함
-    display_df['다운로드'] = display_df['첨부'].apply(
-        lambda x: x if pd.notna(x) and x != "" else "첨부 없음"
+    # 데이터 필터링 (조건에 맞는 파티션만 읽고 조건을 먼저 적용)
+    report_filter = report_query.ReportFilter(
+        date_from=date_from,
+        date_to=date_to,
+        brokers=() if selected_company == "전체" else (selected_company,),
+        search=search_term,
+        sort_by=sort_by,
+        ascending=sort_order == "오름차순"
     )
     
-    # 작성일 형식을 깔끔하게 표시
-    display_df['작성일'] = display_df['작성일'].dt.strftime('%Y-%m-%d')
+    # 차트용 데이터는 필요한 컬럼만 전체 행으로 조회
+    chart_df = dataset.query(replace(report_filter, columns=('증권사', '조회수'))).frame
     
-    # 다운로드 버튼을 포함한 데이터프레임 생성
-    display_df_with_buttons = filtered_df.copy()
+    # 목록은 현재 페이지의 행만 조회
+    page_count = max(1, -(-len(chart_df) // PAGE_SIZE))
+    page = st.number_input(f"페이지 (총 {len(chart_df)}건, {page_count}페이지)", min_value=1, max_value=page_count, value=1)
+    filtered_df = dataset.query(replace(
+        report_filter,
+        columns=('종목명', '제목', '증권사', '첨부', '작성일', '조회수'),
+        limit=PAGE_SIZE,
+        offset=(page - 1) * PAGE_SIZE
+    )).frame
     
-    # 다운로드 버튼 컬럼 추가
-    def create_download_button(url):
-        if pd.notna(url) and url != "":
-            return "📄 다운로드"
-        return "첨부 없음"
-    
-    display_df_with_buttons['다운로드'] = display_df_with_buttons['첨부'].apply(create_download_button)
+    # 미리보기/다운로드 컬럼 추가 (조회 결과는 새로 만든 프레임이므로 복사하지 않음)
+    filtered_df = dashboard_data.add_display_columns(filtered_df)
     
     # 데이터 에디터로 표시 (편집 가능한 테이블)
     edited_df = st.data_editor(
-        display_df_with_buttons[['종목명', '제목', '증권사', '작성일', '조회수', '다운로드']],
+        filtered_df[['종목명', '제목', '증권사', '작성일', '조회수', '다운로드']],
         use_container_width=True,
         height=400,
         column_config={
@@ -253,39 +233,14 @@ if df is not None:
     """, unsafe_allow_html=True)
     
     # 각 행을 개별적으로 표시 (최소 간격) - filtered_df 사용
-    for idx, row in filtered_df.iterrows():
-        col1, col2, col3, col4, col5, col6 = st.columns([1, 2, 1, 1, 1, 1])
-        
-        with col1:
-            st.markdown(f"**{row['종목명']}**", help=str(row['종목명']))
-        
-        with col2:
-            st.markdown(f"*{row['제목']}*", help=str(row['제목']))
-        
-        with col3:
-            st.markdown(f"**{row['증권사']}**", help=str(row['증권사']))
-        
-        with col4:
-            st.markdown(f"**{row['작성일']}**", help=str(row['작성일']))
-        
-        with col5:
-            st.markdown(f"**{row['조회수']}**", help=str(row['조회수']))
-        
-        with col6:
-            if pd.notna(row['첨부']) and row['첨부'] != "":
-                st.link_button("📄 다운로드", row['첨부'], use_container_width=True)
-            else:
-                st.markdown("첨부 없음", help="첨부 파일이 없습니다")
-        
-        # 최소 간격 구분선 추가
-        st.markdown('<hr class="compact-divider">', unsafe_allow_html=True)
+    dashboard_data.render_report_rows(filtered_df)
     
     # 미리보기 섹션
     st.markdown("---")
     st.subheader("🖼️ 리포트 미리보기")
     
     # 미리보기 이미지가 있는 리포트들만 필터링
-    preview_df = display_df[display_df['미리보기'].notna()]
+    preview_df = filtered_df[filtered_df['미리보기'].notna()]
     
     if not preview_df.empty:
         # 9개까지 표시 (3x3 그리드)
@@ -311,122 +266,83 @@ if df is not None:
     st.markdown("---")
     st.subheader("📊 데이터 분석")
     
-    # 차트 섹션
-    col1, col2 = st.columns(2)
+    if chart_df.empty:
+        st.info("선택한 조건에 해당하는 리포트가 없습니다.")
+    else:
+        # 차트 섹션
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.markdown("### 📊 증권사별 리포트 수")
-        company_counts = filtered_df['증권사'].value_counts()
+        with col1:
+            st.markdown("### 📊 증권사별 리포트 수")
+            company_counts = chart_df['증권사'].value_counts()
+            company_counts = company_counts[company_counts > 0]  # category 컬럼은 조건에서 빠진 증권사도 0으로 셈
         
-        # 상위 10개 증권사만 표시
-        top_companies = company_counts.head(10)
+            # 상위 10개 증권사만 표시
+            top_companies = company_counts.head(10)
         
-        fig_company = px.bar(
-            x=top_companies.values,
-            y=top_companies.index,
-            orientation='h',
-            title="",
-            labels={'x': '리포트 수', 'y': '증권사'},
-            color=top_companies.values,
-            color_continuous_scale='Blues'
-        )
+            fig_company = dashboard_data.build_company_chart(top_companies)
         
-        fig_company.update_layout(
-            height=450,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=12),
-            xaxis=dict(
-                title="리포트 수",
-                title_font=dict(size=14, color='#666'),
-                tickfont=dict(size=11),
-                gridcolor='rgba(128,128,128,0.2)'
-            ),
-            yaxis=dict(
-                title="",
-                tickfont=dict(size=11),
-                gridcolor='rgba(128,128,128,0.2)'
-            ),
-            showlegend=False
-        )
+            st.plotly_chart(fig_company, use_container_width=True)
         
-        # 바 위에 값 표시
-        fig_company.update_traces(
-            texttemplate='%{x}',
-            textposition='outside',
-            textfont=dict(size=10, color='#333')
-        )
-        
-        st.plotly_chart(fig_company, use_container_width=True)
-        
-        # 추가 통계 정보
-        st.markdown(f"**총 증권사 수:** {len(company_counts)}개")
-        st.markdown(f"**평균 리포트 수:** {company_counts.mean():.1f}개")
+            # 추가 통계 정보
+            st.markdown(f"**총 증권사 수:** {len(company_counts)}개")
+            st.markdown(f"**평균 리포트 수:** {company_counts.mean():.1f}개")
     
-    with col2:
-        st.markdown("### 📈 조회수 분석")
+        with col2:
+            st.markdown("### 📈 조회수 분석")
         
-        # 조회수 통계
-        views_stats = filtered_df['조회수'].describe()
+            # 조회수 통계
+            views_stats = chart_df['조회수'].describe()
         
-        # 조회수 분포 히스토그램
-        fig_views = px.histogram(
-            filtered_df,
-            x='조회수',
-            nbins=12,  # 구간 수 줄여서 막대 간격 확보
-            title="",
-            labels={'조회수': '조회수', 'count': '리포트 수'},
-            color_discrete_sequence=['#2E86AB']
-        )
+            # 조회수 분포 히스토그램
+            fig_views = dashboard_data.build_views_histogram(chart_df)
         
-        fig_views.update_layout(
-            height=450,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=12),
-            bargap=0.15,  # 막대 간격 설정
-            bargroupgap=0.1,  # 그룹 간격 설정
-            xaxis=dict(
-                title="조회수",
-                title_font=dict(size=14, color='#666'),
-                tickfont=dict(size=11),
-                gridcolor='rgba(128,128,128,0.2)',
-                showgrid=True,
-                zeroline=False
-            ),
-            yaxis=dict(
-                title="리포트 수",
-                title_font=dict(size=14, color='#666'),
-                tickfont=dict(size=11),
-                gridcolor='rgba(128,128,128,0.2)',
-                showgrid=True,
-                zeroline=False
-            ),
-            showlegend=False
-        )
+            st.plotly_chart(fig_views, use_container_width=True)
         
-        # 히스토그램 스타일 개선
-        fig_views.update_traces(
-            marker=dict(
-                line=dict(width=2, color='white'),  # 테두리 두께 증가
-                opacity=0.85,  # 투명도 조정
-                color='#2E86AB'
-            ),
-            hovertemplate='조회수 범위: %{x}<br>리포트 수: %{y}<extra></extra>'  # 호버 정보 개선
-        )
+            # 조회수 통계 정보
+            col_a, col_b, col_c = st.columns(3)
+            with col_a:
+                st.metric("평균 조회수", f"{views_stats['mean']:.0f}")
+            with col_b:
+                st.metric("최대 조회수", f"{views_stats['max']:.0f}")
+            with col_c:
+                st.metric("중간값", f"{views_stats['50%']:.0f}")
+    
+    # 조회수 추이
+    st.markdown("---")
+    st.subheader("📈 조회수 추이")
+    
+    store_mtime = os.path.getmtime(view_tracker.STORE_PATH) if os.path.exists(view_tracker.STORE_PATH) else 0
+    view_records, view_meta = load_view_history(store_mtime)
+    
+    if len(view_records) == 0:
+        st.info("수집된 조회수 추이가 없습니다. 스케줄러가 매시 30분에 조회수를 기록합니다.")
+    else:
+        trend_mode = st.radio("추이 기준", ["리포트별", "증권사별"], horizontal=True)
         
-        st.plotly_chart(fig_views, use_container_width=True)
+        if trend_mode == "리포트별":
+            # 최근 작성일 순으로 리포트 선택지 구성
+            report_items = sorted(view_meta["reports"].items(), key=lambda item: item[1]['작성일'], reverse=True)
+            selected_nid = st.selectbox(
+                "리포트 선택",
+                [nid for nid, _ in report_items],
+                format_func=lambda nid: f"{view_meta['reports'][nid]['종목명']} - {view_meta['reports'][nid]['제목']} ({view_meta['reports'][nid]['증권사']})"
+            )
+            trend_df = view_tracker.view_series(selected_nid, records=view_records)
+            fig_trend = px.line(trend_df, x='시각', y='조회수', markers=True, line_shape='hv')
+        else:
+            brokers = sorted({info['증권사'] for info in view_meta["reports"].values()})
+            selected_broker = st.selectbox("증권사 선택", brokers)
+            trend_df = view_tracker.broker_series(selected_broker, records=view_records, meta=view_meta)
+            fig_trend = px.line(trend_df, x='시각', y='조회수', markers=True)
         
-        # 조회수 통계 정보
-        col_a, col_b, col_c = st.columns(3)
-        with col_a:
-            st.metric("평균 조회수", f"{views_stats['mean']:.0f}")
-        with col_b:
-            st.metric("최대 조회수", f"{views_stats['max']:.0f}")
-        with col_c:
-            st.metric("중간값", f"{views_stats['50%']:.0f}")
+        fig_trend.update_layout(
+            height=350,
+            margin=dict(l=20, r=20, t=20, b=20),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        st.plotly_chart(fig_trend, use_container_width=True)
     
     # 4. 실시간 정보
     st.markdown("---")
@@ -438,16 +354,19 @@ if df is not None:
         st.info(f"**마지막 업데이트:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     with col2:
-        st.info(f"**데이터 파일:** {filename}")
+        st.info(f"**조회 기간:** {date_from} ~ {date_to}")
     
-    # 자동 새로고침
+    # 새로고침 (전체 캐시를 비우지 않고 새 이벤트만 반영)
     if st.button("🔄 새로고침"):
-        st.cache_data.clear()
+        get_dataset_service().refresh()
         st.rerun()
 
 else:
     st.error("데이터를 로드할 수 없습니다. CSV 파일이 있는지 확인해주세요.")
 
+# 새 리포트/실행 완료 이벤트 구독
+watch_events()
+
 # 푸터
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,167 @@
+"""
+대시보드 데이터 준비 함수
+
+Streamlit 없이도 호출할 수 있도록 대시보드의 표/차트 데이터 준비 코드를 모아 둔 모듈입니다.
+(scripts/benchmark_dashboard.py에서 단계별 시간/메모리를 측정할 때 사용)
+render_report_rows만 Streamlit 화면 안에서 호출합니다. (벤치마크는 AppTest로 따로 측정)
+"""
+
+import glob
+
+import pandas as pd
+import plotly.express as px
+
+PREVIEW_IMAGE_DIR = 'data/images/first_page'
+
+
+def get_preview_image_path(row, image_dir=PREVIEW_IMAGE_DIR):
+    """리포트의 미리보기 이미지 경로를 생성합니다."""
+    if pd.notna(row['첨부']) and row['첨부'] != "":
+        # first_page 폴더에서 해당 종목의 이미지 파일 찾기
+        pattern = f"{image_dir}/{row['종목명']}_*.jpg"
+        matching_files = glob.glob(pattern)
+
+        if matching_files:
+            # 첫 번째 매칭 파일 반환
+            return matching_files[0]
+
+    return None
+
+
+def create_download_button(url):
+    if pd.notna(url) and url != "":
+        return "📄 다운로드"
+    return "첨부 없음"
+
+
+def add_display_columns(df, image_dir=PREVIEW_IMAGE_DIR):
+    """목록 표시에 쓰는 미리보기/다운로드 컬럼을 추가합니다."""
+    if df.empty:  # 빈 프레임에 apply하면 Series가 아닌 DataFrame이 반환됨
+        df['미리보기'] = pd.Series(dtype=object)
+    else:
+        df['미리보기'] = df.apply(get_preview_image_path, axis=1, image_dir=image_dir)
+    df['다운로드'] = df['첨부'].apply(create_download_button)
+    return df
+
+
+def render_report_rows(df):
+    """목록의 각 행을 종목명/제목/증권사/작성일/조회수/다운로드 버튼 열로 그립니다."""
+    import streamlit as st
+
+    for idx, row in df.iterrows():
+        col1, col2, col3, col4, col5, col6 = st.columns([1, 2, 1, 1, 1, 1])
+        
+        with col1:
+            st.markdown(f"**{row['종목명']}**", help=str(row['종목명']))
+        
+        with col2:
+            st.markdown(f"*{row['제목']}*", help=str(row['제목']))
+        
+        with col3:
+            st.markdown(f"**{row['증권사']}**", help=str(row['증권사']))
+        
+        with col4:
+            st.markdown(f"**{row['작성일']}**", help=str(row['작성일']))
+        
+        with col5:
+            st.markdown(f"**{row['조회수']}**", help=str(row['조회수']))
+        
+        with col6:
+            if pd.notna(row['첨부']) and row['첨부'] != "":
+                st.link_button("📄 다운로드", row['첨부'], use_container_width=True)
+            else:
+                st.markdown("첨부 없음", help="첨부 파일이 없습니다")
+        
+        # 최소 간격 구분선 추가
+        st.markdown('<hr class="compact-divider">', unsafe_allow_html=True)
+
+
+def build_company_chart(top_companies):
+    """증권사별 리포트 수 막대 차트"""
+    fig_company = px.bar(
+        x=top_companies.values,
+        y=top_companies.index,
+        orientation='h',
+        title="",
+        labels={'x': '리포트 수', 'y': '증권사'},
+        color=top_companies.values,
+        color_continuous_scale='Blues'
+    )
+
+    fig_company.update_layout(
+        height=450,
+        margin=dict(l=20, r=20, t=40, b=20),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12),
+        xaxis=dict(
+            title="리포트 수",
+            title_font=dict(size=14, color='#666'),
+            tickfont=dict(size=11),
+            gridcolor='rgba(128,128,128,0.2)'
+        ),
+        yaxis=dict(
+            title="",
+            tickfont=dict(size=11),
+            gridcolor='rgba(128,128,128,0.2)'
+        ),
+        showlegend=False
+    )
+
+    # 바 위에 값 표시
+    fig_company.update_traces(
+        texttemplate='%{x}',
+        textposition='outside',
+        textfont=dict(size=10, color='#333')
+    )
+    return fig_company
+
+
+def build_views_histogram(chart_df):
+    """조회수 분포 히스토그램"""
+    fig_views = px.histogram(
+        chart_df,
+        x='조회수',
+        nbins=12,  # 구간 수 줄여서 막대 간격 확보
+        title="",
+        labels={'조회수': '조회수', 'count': '리포트 수'},
+        color_discrete_sequence=['#2E86AB']
+    )
+
+    fig_views.update_layout(
+        height=450,
+        margin=dict(l=20, r=20, t=40, b=20),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12),
+        bargap=0.15,  # 막대 간격 설정
+        bargroupgap=0.1,  # 그룹 간격 설정
+        xaxis=dict(
+            title="조회수",
+            title_font=dict(size=14, color='#666'),
+            tickfont=dict(size=11),
+            gridcolor='rgba(128,128,128,0.2)',
+            showgrid=True,
+            zeroline=False
+        ),
+        yaxis=dict(
+            title="리포트 수",
+            title_font=dict(size=14, color='#666'),
+            tickfont=dict(size=11),
+            gridcolor='rgba(128,128,128,0.2)',
+            showgrid=True,
+            zeroline=False
+        ),
+        showlegend=False
+    )
+
+    # 히스토그램 스타일 개선
+    fig_views.update_traces(
+        marker=dict(
+            line=dict(width=2, color='white'),  # 테두리 두께 증가
+            opacity=0.85,  # 투명도 조정
+            color='#2E86AB'
+        ),
+        hovertemplate='조회수 범위: %{x}<br>리포트 수: %{y}<extra></extra>'  # 호버 정보 개선
+    )
+    return fig_views
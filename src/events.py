@@ -0,0 +1,119 @@
+"""
+크롤러/스케줄러 이벤트 로그
+
+새 리포트 수집, 크롤링 실행 시작/종료 같은 이벤트를 append-only JSONL 파일에 기록합니다.
+대시보드는 마지막으로 읽은 위치(파일 inode, 바이트 offset)를 기억해 두고 그 이후의 이벤트만 읽어서
+캐시된 데이터에 변경분만 반영합니다.
+로그가 MAX_LOG_BYTES를 넘으면 events.jsonl.1로 옮기고 새 파일에 기록합니다. (이전 파일은 1개만 보관)
+읽는 쪽은 inode가 바뀐 것으로 교체를 알아채고, 이전 파일의 남은 부분을 읽은 뒤 새 파일을 처음부터 읽습니다.
+
+이벤트 형식: {"type": "new_reports", "time": "2025-08-19T09:00:12", "data": {...}}
+"""
+
+import fcntl
+import json
+import os
+from datetime import datetime
+
+EVENT_LOG = 'logs/events.jsonl'
+
+NEW_REPORTS = 'new_reports'
+RUN_STARTED = 'run_started'
+RUN_FINISHED = 'run_finished'
+
+MAX_LOG_BYTES = 20 * 1024 * 1024
+
+
+def rotated_path(path=EVENT_LOG):
+    return f"{path}.1"
+
+
+def _rotate(fd, path):
+    """fd가 가리키는 로그가 아직 교체 전이면 이전 파일로 옮기고, 새 로그 파일의 fd를 반환"""
+    with open(f"{path}.lock", 'w') as lock:
+        # 여러 프로세스가 동시에 교체하여 방금 만든 새 로그를 덮어쓰지 않도록 잠금
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            current = os.stat(path)
+        except OSError:
+            current = None
+        opened = os.fstat(fd)
+        if current and current.st_ino == opened.st_ino and current.st_size >= MAX_LOG_BYTES:
+            os.replace(path, rotated_path(path))
+    os.close(fd)
+    return os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+
+def publish_event(event_type, data, path=EVENT_LOG):
+    """이벤트를 로그 파일 끝에 한 줄로 추가"""
+    event = {"type": event_type, "time": datetime.now().isoformat(), "data": data}
+    line = (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # O_APPEND로 한 번에 기록하여 여러 프로세스가 동시에 써도 줄이 섞이지 않도록 함
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size >= MAX_LOG_BYTES:
+            fd = _rotate(fd, path)
+        os.write(fd, line)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def current_offset(path=EVENT_LOG):
+    """현재 로그 끝 위치 (inode, offset)를 반환 (이후 이벤트만 구독할 때 사용)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, 0
+    return stat.st_ino, stat.st_size
+
+
+def _read_chunk(path, offset, size):
+    """path의 offset~size 구간에서 완성된 줄의 이벤트 목록과 읽은 바이트 수를 반환"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        chunk = f.read(size - offset)
+
+    # 아직 기록 중인 마지막 줄은 다음에 읽음
+    end = chunk.rfind(b"\n") + 1
+    events = []
+    for line in chunk[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events, end
+
+
+def read_events(position=(None, 0), path=EVENT_LOG):
+    """position (inode, offset) 이후의 이벤트 목록과 다음에 읽을 위치를 반환"""
+    inode, offset = position
+    try:
+        stat = os.stat(path)
+    except OSError:
+        stat = None  # 교체 직후이거나 로그가 지워진 경우
+
+    events = []
+    if inode is not None and (stat is None or stat.st_ino != inode):
+        # 로그가 교체된 경우 이전 파일에서 아직 읽지 않은 부분을 먼저 읽고 새 파일을 처음부터 읽음
+        try:
+            rotated = os.stat(rotated_path(path))
+        except OSError:
+            rotated = None
+        if rotated is not None and rotated.st_ino == inode and rotated.st_size > offset:
+            events, _ = _read_chunk(rotated_path(path), offset, rotated.st_size)
+        offset = 0
+    elif stat is not None and stat.st_size < offset:  # 같은 파일이 잘린 경우 처음부터 다시 읽음
+        offset = 0
+
+    if stat is None:
+        return events, (None, 0)
+    if stat.st_size == offset:
+        return events, (stat.st_ino, offset)
+
+    new_events, end = _read_chunk(path, offset, stat.st_size)
+    return events + new_events, (stat.st_ino, offset + end)
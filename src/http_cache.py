@@ -0,0 +1,210 @@
+"""
+크롤러용 로컬 HTTP 캐시
+
+응답 본문을 ETag/Last-Modified와 함께 저장하고, URL별 TTL 안에서는 네트워크 없이
+캐시를 돌려주며, TTL이 지나면 조건부 요청(If-None-Match/If-Modified-Since)을 보냅니다.
+
+캐시 모드 (환경 변수 REPORT_HTTP_CACHE 로 지정)
+- network: 기본값. TTL + 조건부 요청
+- replay: 캐시에서만 응답 (개발/테스트용, 캐시에 없으면 CacheMiss)
+- off: 캐시를 사용하지 않음 (응답과 파싱 결과를 읽거나 저장하지 않음. 다시 읽을 일이 없는 백필 등에 사용)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+
+CACHE_DIR = 'data/cache'
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# (URL 정규식, TTL 초) - 먼저 매칭되는 규칙을 사용
+DEFAULT_TTL_RULES = [
+    (r'company_list\.naver.*[?&]page=1(?!\d)', 60),  # 첫 페이지는 새 리포트가 자주 올라옴
+    (r'company_list\.naver', 600),
+]
+
+CACHE_MODES = ('network', 'replay', 'off')
+
+
+class CacheMiss(Exception):
+    """replay 모드에서 캐시에 없는 URL을 요청한 경우"""
+
+
+class CachedResponse:
+    """캐시 계층을 거친 응답"""
+
+    def __init__(self, url, status_code, content, headers, from_cache=False,
+                 not_modified=False, changed=True, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache  # 네트워크 요청 없이 캐시에서 응답
+        self.not_modified = not_modified  # 서버가 304를 응답
+        self.changed = changed  # 이전에 저장된 본문과 바이트가 다름
+        self.encoding = encoding
+        self.digest = hashlib.sha256(content).hexdigest()
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class HttpCache:
+    """ETag/Last-Modified 기반 조건부 요청과 URL별 TTL을 지원하는 파일 캐시"""
+
+    def __init__(self, cache_dir=CACHE_DIR, mode=None, ttl_rules=None, session=None, min_interval=0):
+        self.cache_dir = cache_dir
+        self.mode = mode or os.environ.get('REPORT_HTTP_CACHE', 'network')
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"알 수 없는 캐시 모드: {self.mode}")
+        self.ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in (ttl_rules or DEFAULT_TTL_RULES)]
+        self.session = session or requests.Session()
+        self.min_interval = min_interval  # 실제 네트워크 요청 사이의 최소 간격(초)
+        self.stats = {"network": 0, "not_modified": 0, "fresh": 0, "replay": 0}
+        self._last_request = 0.0
+        self._throttle_lock = threading.Lock()
+
+    def throttle(self):
+        """서버 부하 방지를 위해 네트워크 요청 간격을 유지"""
+        with self._throttle_lock:
+            wait = self._last_request + self.min_interval - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.time()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, 'http', key)
+        return base + '.body', base + '.json'
+
+    def ttl_for(self, url):
+        """URL에 적용할 TTL(초)을 반환"""
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return 0
+
+    def _load(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            return meta, body
+        except (OSError, ValueError):
+            return None, None
+
+    def _store(self, url, meta, body=None):
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        if body is not None:
+            _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+    def get(self, url, headers=None, encoding=None, timeout=30):
+        """캐시를 거쳐 URL을 가져옵니다."""
+        request_headers = dict(DEFAULT_HEADERS)
+        request_headers.update(headers or {})
+
+        if self.mode == 'off':
+            self.throttle()
+            response = self.session.get(url, headers=request_headers, timeout=timeout)
+            response.raise_for_status()
+            self.stats["network"] += 1
+            return CachedResponse(url, response.status_code, response.content,
+                                  dict(response.headers), encoding=encoding)
+
+        meta, body = self._load(url)
+
+        if self.mode == 'replay':
+            if meta is None:
+                raise CacheMiss(url)
+            self.stats["replay"] += 1
+            return CachedResponse(url, meta["status_code"], body, meta["headers"],
+                                  from_cache=True, changed=False, encoding=encoding)
+
+        now = time.time()
+        if meta is not None and now - meta["fetched_at"] < self.ttl_for(url):
+            self.stats["fresh"] += 1
+            return CachedResponse(url, meta["status_code"], body, meta["headers"],
+                                  from_cache=True, changed=False, encoding=encoding)
+
+        if meta is not None:
+            if meta["headers"].get("ETag"):
+                request_headers["If-None-Match"] = meta["headers"]["ETag"]
+            if meta["headers"].get("Last-Modified"):
+                request_headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        self.throttle()
+        response = self.session.get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta is not None:
+            self.stats["not_modified"] += 1
+            meta["fetched_at"] = now
+            self._store(url, meta)
+            return CachedResponse(url, meta["status_code"], body, meta["headers"],
+                                  not_modified=True, changed=False, encoding=encoding)
+
+        response.raise_for_status()
+        self.stats["network"] += 1
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        changed = meta is None or meta.get("digest") != digest
+        new_meta = {
+            "url": url,
+            "status_code": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in ("ETag", "Last-Modified", "Content-Type")
+                if name in response.headers
+            },
+            "fetched_at": now,
+            "digest": digest,
+        }
+        self._store(url, new_meta, response.content if changed else None)
+        return CachedResponse(url, response.status_code, response.content, new_meta["headers"],
+                              changed=changed, encoding=encoding)
+
+    def get_parsed(self, url, digest, version):
+        """URL의 현재 본문(digest)에 대해 저장된 파싱 결과를 반환 (없거나 본문이 바뀌었으면 None)"""
+        if self.mode == 'off':
+            return None
+        try:
+            with open(self._parsed_path(url), 'r', encoding='utf-8') as f:
+                parsed = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if parsed.get("digest") != digest or parsed.get("version") != version:
+            return None
+        return parsed["data"]
+
+    def put_parsed(self, url, digest, version, data):
+        """URL의 파싱 결과를 저장 (URL마다 최신 본문의 결과 하나만 유지)"""
+        if self.mode == 'off':
+            return
+        path = self._parsed_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        parsed = {"digest": digest, "version": version, "data": data}
+        _atomic_write(path, json.dumps(parsed, ensure_ascii=False).encode('utf-8'))
+
+    def _parsed_path(self, url):
+        body_path, _ = self._paths(url)
+        return body_path[:-len('.body')] + '.parsed.json'
+
+
+def _atomic_write(path, data):
+    """임시 파일에 쓴 뒤 교체하여 중간 상태의 파일이 남지 않도록 저장"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
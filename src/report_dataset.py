@@ -0,0 +1,188 @@
+"""
+프로세스 공유 리포트 데이터셋
+
+대시보드의 모든 세션(과 API 서버)이 같은 데이터 사본 하나를 공유하도록 합니다.
+- ReportDataset: 특정 시점의 데이터 버전. 한 번 만든 파티션 프레임은 수정하지 않습니다.
+- DatasetService: 백그라운드 스레드가 이벤트 로그를 읽어 변경된 파티션만 새 프레임으로 만든 뒤
+  새 버전으로 통째로 교체합니다. 읽는 쪽은 current()로 받은 버전을 끝까지 그대로 사용합니다.
+"""
+
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+
+import pandas as pd
+
+import events
+import report_query
+
+REPORT_KEY = ['종목명', '제목', '증권사', '작성일']
+CATEGORY_COLUMNS = ['종목명', '증권사']  # 값 종류가 적어 category로 저장
+
+
+def compact_frame(df):
+    """파티션 프레임의 컬럼 타입을 메모리를 적게 쓰는 타입으로 변환"""
+    df = report_query.normalize_frame(df)
+    for name in CATEGORY_COLUMNS:
+        if name in df.columns:
+            df[name] = df[name].astype('category')
+    if '조회수' in df.columns:
+        df['조회수'] = pd.to_numeric(df['조회수'], downcast='integer')
+    return df
+
+
+class ReportDataset:
+    """리포트 데이터의 한 버전 (파티션은 처음 조회할 때 읽고, 읽은 뒤에는 바뀌지 않음)"""
+
+    def __init__(self, version, paths, frames=None, scheduler_status=None):
+        self.version = version
+        self.paths = MappingProxyType(dict(sorted(paths.items())))  # 파티션 날짜 -> 파일 경로
+        self.scheduler_status = scheduler_status
+        self.created_at = datetime.now()
+        self._frames = dict(frames or {})  # 읽어 둔 파티션 (추가만 됨)
+        self._lock = threading.Lock()
+
+    @property
+    def days(self):
+        return list(self.paths)
+
+    def partition(self, day):
+        """파티션 프레임 (처음이면 파일에서 읽음). 반환된 프레임은 수정하지 말 것"""
+        frame = self._frames.get(day)
+        if frame is None:
+            try:
+                frame = compact_frame(report_query.read_partition(self.paths[day]))
+            except (FileNotFoundError, pd.errors.ParserError) as e:
+                # 목록을 만든 뒤 지워졌거나 깨진 파일은 빈 파티션으로 취급 (저장하지 않아 다음 조회 때 다시 읽음)
+                print(f"파티션 읽기 실패 ({day}): {e}")
+                return compact_frame(report_query.empty_frame())
+            with self._lock:
+                frame = self._frames.setdefault(day, frame)
+        return frame
+
+    def loaded_frames(self):
+        with self._lock:
+            return dict(self._frames)
+
+    def query(self, spec):
+        """이 버전의 데이터에서 리포트를 조회"""
+        return report_query.run_query(
+            spec,
+            partitions={day: day for day in self.paths},
+            load=lambda day, columns: self.partition(day)
+        )
+
+    def memory_usage(self):
+        """읽어 둔 파티션의 메모리 사용량 (바이트)"""
+        return sum(int(frame.memory_usage(deep=True).sum()) for frame in self.loaded_frames().values())
+
+    def evolve(self, deltas=None, scheduler_status=None):
+        """변경분을 반영한 새 버전을 만듦 (이 버전은 그대로 유지)
+
+        deltas: {파티션 날짜: (파일 경로, 새 리포트 행 목록)}
+        """
+        paths = dict(self.paths)
+        frames = self.loaded_frames()
+
+        for day, (path, rows) in (deltas or {}).items():
+            paths[day] = path
+            frame = frames.get(day)
+            if frame is None:
+                continue  # 아직 읽지 않은 파티션은 다음에 파일에서 읽음
+            delta = compact_frame(pd.DataFrame(rows))
+            merged = pd.concat([frame.astype({name: object for name in CATEGORY_COLUMNS}), delta],
+                               ignore_index=True)
+            merged = merged.drop_duplicates(subset=REPORT_KEY, keep='last').reset_index(drop=True)
+            frames[day] = compact_frame(merged)
+
+        return ReportDataset(
+            self.version + 1,
+            paths,
+            frames,
+            self.scheduler_status if scheduler_status is None else scheduler_status,
+        )
+
+
+class DatasetService:
+    """공유 데이터셋을 보관하고 백그라운드에서 새 버전으로 교체"""
+
+    def __init__(self, csv_dir=report_query.CSV_DIR, poll_interval=5, preload=True, status_loader=None):
+        self.csv_dir = csv_dir
+        self.poll_interval = poll_interval
+        self.preload = preload
+        self.status_loader = status_loader  # 처음 한 번 스케줄러 상태를 읽는 함수
+        self._current = None
+        self._offset = (None, 0)  # 이벤트 로그에서 다음에 읽을 위치 (inode, offset)
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """첫 버전을 만들고 백그라운드 갱신 스레드를 시작"""
+        # 파일 목록을 읽기 전에 위치를 잡아 두어 그 사이에 발행된 이벤트를 놓치지 않도록 함
+        self._offset = events.current_offset()
+        status = self.status_loader() if self.status_loader else None
+        self._current = ReportDataset(0, report_query.list_partitions(self.csv_dir), scheduler_status=status)
+        self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def current(self):
+        """현재 버전 (요청 하나를 처리하는 동안 같은 버전을 계속 사용할 것)"""
+        return self._current
+
+    def refresh(self):
+        """새 이벤트를 반영한 버전으로 교체. 교체했으면 True"""
+        with self._swap_lock:
+            new_events, self._offset = events.read_events(self._offset)
+            if not new_events:
+                return False
+
+            deltas = {}
+            status = None
+            for event in new_events:
+                data = event.get("data", {})
+                if event["type"] == events.NEW_REPORTS:
+                    day = report_query.partition_date(data.get("file", ""))
+                    if day is None or not data.get("reports"):
+                        continue
+                    path, rows = deltas.get(day, (data["file"], []))
+                    deltas[day] = (path, rows + data["reports"])
+                elif event["type"] in (events.RUN_STARTED, events.RUN_FINISHED):
+                    status = data.get("status", status)
+
+            if not deltas and status is None:
+                return False
+
+            # 참조 교체는 원자적이므로 읽는 쪽은 이전 버전이나 새 버전 중 하나만 봄
+            self._current = self._current.evolve(deltas, scheduler_status=status)
+            return True
+
+    def _run(self):
+        if self.preload:
+            # 처음 조회가 느리지 않도록 모든 파티션을 미리 읽어 둠 (도중에 교체되면 새 버전에 읽음)
+            last_refresh = time.time()
+            for day in self._current.days:
+                if self._stop.is_set():
+                    return
+                try:
+                    self._current.partition(day)
+                except Exception as e:
+                    print(f"파티션 미리 읽기 실패 ({day}): {e}")
+                if time.time() - last_refresh >= self.poll_interval:
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        print(f"데이터셋 갱신 실패: {e}")
+                    last_refresh = time.time()
+
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"데이터셋 갱신 실패: {e}")
+            self._stop.wait(self.poll_interval)
@@ -0,0 +1,205 @@
+"""
+리포트 조회 모듈
+
+data/csv/research_reports_YYYYMMDD.csv 파일을 날짜 파티션으로 보고, 필터 조건(날짜 범위,
+증권사, 종목, 검색어, 정렬, limit/offset)에 맞는 파티션만 읽습니다.
+각 파티션에서 조건을 먼저 적용한 뒤 합치고, 요청한 컬럼과 행만 반환합니다.
+after를 지정하면 (정렬 컬럼, 리포트 키) 순서에서 그 행 다음부터 조회합니다. (키셋 페이지네이션)
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+CSV_DIR = 'data/csv'
+PARTITION_PATTERN = re.compile(r'research_reports_(\d{8})\.csv$')
+
+REPORT_COLUMNS = ['종목명', '제목', '증권사', '첨부', '작성일', '조회수', '리포트ID']
+SORT_COLUMNS = ['작성일', '조회수', '종목명', '증권사']
+REPORT_KEY = ['종목명', '제목', '증권사', '작성일']  # 같은 리포트인지 판단하는 컬럼 (크롤러와 동일)
+
+
+@dataclass(frozen=True)
+class ReportFilter:
+    """리포트 조회 조건"""
+    date_from: Optional[object] = None  # datetime.date, 포함
+    date_to: Optional[object] = None  # datetime.date, 포함
+    brokers: tuple = ()
+    stocks: tuple = ()
+    search: str = ""  # 종목명 또는 제목 검색어
+    sort_by: str = '작성일'
+    ascending: bool = False
+    limit: Optional[int] = None
+    offset: int = 0
+    columns: Optional[tuple] = None  # None이면 전체 컬럼
+    after: Optional[tuple] = None  # order_columns(spec) 순서의 값. 이 행 다음부터 조회 (()이면 처음부터 같은 순서로)
+
+
+@dataclass
+class QueryResult:
+    """조회 결과 (frame은 limit/offset이 적용된 행, total은 조건에 맞는 전체 행 수)"""
+    frame: pd.DataFrame
+    total: int
+    partitions: list = field(default_factory=list)  # 실제로 읽은 파티션 날짜
+
+
+def partition_date(path):
+    """파일 경로에서 파티션 날짜를 추출 (형식이 다르면 None)"""
+    match = PARTITION_PATTERN.search(os.path.basename(path))
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), '%Y%m%d').date()
+
+
+def list_partitions(csv_dir=CSV_DIR):
+    """{파티션 날짜: 파일 경로}를 날짜 순으로 반환"""
+    partitions = {}
+    if os.path.isdir(csv_dir):
+        for name in os.listdir(csv_dir):
+            day = partition_date(name)
+            if day is not None:
+                partitions[day] = os.path.join(csv_dir, name)
+    return dict(sorted(partitions.items()))
+
+
+def normalize_frame(df):
+    """CSV나 이벤트에서 읽은 리포트 프레임의 타입을 맞춤"""
+    if '작성일' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['작성일']):
+        df['작성일'] = pd.to_datetime(df['작성일'], format='%y.%m.%d', errors='coerce')
+    if '조회수' in df.columns and not pd.api.types.is_numeric_dtype(df['조회수']):
+        df['조회수'] = pd.to_numeric(df['조회수'].astype(str).str.replace(',', ''), errors='coerce')
+    if '첨부' in df.columns:
+        # 이벤트의 행은 첨부가 없으면 ""이고 CSV에서 읽은 행은 NaN이므로 NaN으로 통일
+        df['첨부'] = df['첨부'].replace('', np.nan)
+    return df
+
+
+def empty_frame(columns=None):
+    """조회 결과가 없을 때 쓰는 빈 프레임 (작성일/조회수는 데이터가 있을 때와 같은 타입)"""
+    columns = list(columns or REPORT_COLUMNS)
+    return normalize_frame(pd.DataFrame({
+        name: pd.Series(dtype='float64' if name == '조회수' else object) for name in columns
+    }))
+
+
+def read_partition(path, columns=None):
+    """파티션 파일에서 필요한 컬럼만 읽음"""
+    usecols = None if columns is None else (lambda name: name in columns)
+    try:
+        df = pd.read_csv(path, usecols=usecols, encoding='utf-8-sig',
+                         dtype={'리포트ID': str, '첨부': str})
+    except pd.errors.EmptyDataError:
+        return empty_frame(columns)
+    return normalize_frame(df)
+
+
+def prune_partitions(partitions, date_from=None, date_to=None):
+    """날짜 범위에 해당하는 파티션 날짜만 반환"""
+    return [
+        day for day in partitions
+        if (date_from is None or day >= date_from) and (date_to is None or day <= date_to)
+    ]
+
+
+def order_columns(spec):
+    """키셋 조회의 정렬 순서 (정렬 컬럼 값이 같으면 리포트 키로 순서를 정함)"""
+    return [spec.sort_by] + [name for name in REPORT_KEY if name != spec.sort_by]
+
+
+def needed_columns(spec):
+    """결과 컬럼과 조건 평가에 필요한 컬럼"""
+    columns = list(spec.columns or REPORT_COLUMNS)
+    for name in ['작성일', spec.sort_by] + (order_columns(spec) if spec.after is not None else []):
+        if name not in columns:
+            columns.append(name)
+    if spec.brokers and '증권사' not in columns:
+        columns.append('증권사')
+    if spec.stocks and '종목명' not in columns:
+        columns.append('종목명')
+    if spec.search:
+        columns.extend(name for name in ('종목명', '제목') if name not in columns)
+    return columns
+
+
+def filter_frame(df, spec):
+    """파티션 하나에 조건을 적용"""
+    mask = pd.Series(True, index=df.index)
+    if spec.date_from is not None:
+        mask &= df['작성일'] >= pd.Timestamp(spec.date_from)
+    if spec.date_to is not None:
+        mask &= df['작성일'] < pd.Timestamp(spec.date_to) + pd.Timedelta(days=1)
+    if spec.brokers:
+        mask &= df['증권사'].isin(spec.brokers)
+    if spec.stocks:
+        mask &= df['종목명'].isin(spec.stocks)
+    if spec.search:
+        mask &= (
+            df['종목명'].str.contains(spec.search, case=False, na=False, regex=False) |
+            df['제목'].str.contains(spec.search, case=False, na=False, regex=False)
+        )
+    return df[mask]
+
+
+def after_mask(df, spec):
+    """order_columns(spec) 순서에서 spec.after보다 뒤에 오는 행
+
+    sort_values와 같이 값이 없는 행(NaN)은 정렬 방향과 관계없이 맨 뒤에 오는 것으로 봅니다.
+    """
+    mask = pd.Series(False, index=df.index)
+    equal = pd.Series(True, index=df.index)
+    for name, value in zip(order_columns(spec), spec.after):
+        column = df[name].astype(object) if isinstance(df[name].dtype, pd.CategoricalDtype) else df[name]
+        missing = column.isna()
+        if pd.isna(value):
+            # 커서 값이 없으면 같은 값(없는 값)인 행만 다음 컬럼으로 비교
+            equal &= missing
+            continue
+        present = column[~missing]  # 문자열 컬럼의 NaN은 비교할 수 없으므로 값이 있는 행만 비교
+        beyond = missing | (present > value if spec.ascending else present < value).reindex(df.index, fill_value=False)
+        mask |= equal & beyond
+        equal &= ~missing & (column == value)
+    return mask
+
+
+def run_query(spec, partitions=None, load=read_partition):
+    """조건에 맞는 파티션만 읽어 리포트를 조회
+
+    partitions: {날짜: 키}. 생략하면 CSV_DIR의 파일 목록을 사용
+    load: load(키, 컬럼 목록) -> DataFrame. 메모리에 캐시된 파티션을 쓸 때 교체
+    """
+    if spec.sort_by not in SORT_COLUMNS:
+        raise ValueError(f"정렬할 수 없는 컬럼: {spec.sort_by}")
+    if partitions is None:
+        partitions = list_partitions()
+
+    days = prune_partitions(partitions, spec.date_from, spec.date_to)
+    columns = needed_columns(spec)
+
+    frames = []
+    for day in days:
+        df = load(partitions[day], columns)
+        df = filter_frame(df[[name for name in columns if name in df.columns]], spec)
+        if not df.empty:
+            frames.append(df)
+
+    output_columns = list(spec.columns or REPORT_COLUMNS)
+    if not frames:
+        return QueryResult(empty_frame(output_columns), 0, days)
+
+    result = pd.concat(frames, ignore_index=True)
+    total = len(result)
+    if spec.after is not None:
+        if spec.after:
+            result = result[after_mask(result, spec)]
+        result = result.sort_values(order_columns(spec), ascending=spec.ascending, kind='stable')
+    else:
+        result = result.sort_values(spec.sort_by, ascending=spec.ascending, kind='stable')
+
+    end = None if spec.limit is None else spec.offset + spec.limit
+    result = result.iloc[spec.offset:end]
+    return QueryResult(result[[name for name in output_columns if name in result.columns]].reset_index(drop=True), total, days)
@@ -6,6 +6,8 @@ import json
 from datetime import datetime, timedelta
 import logging
 
+from events import RUN_FINISHED, RUN_STARTED, publish_event
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -16,6 +18,21 @@ logging.basicConfig(
     ]
 )
 
+# 크롤러가 페이지마다 갱신하는 체크포인트 (다른 프로세스에서 실행 중인 크롤링 확인용)
+CRAWL_CHECKPOINT_PATH = 'data/checkpoints/crawl.json'
+CRAWL_STALE_SECONDS = 600  # 이 시간 동안 갱신이 없으면 중간에 종료된 크롤링으로 봄
+
+def is_crawl_running(path=CRAWL_CHECKPOINT_PATH):
+    """크롤링이 진행 중인지 체크포인트로 확인 (스케줄러 밖에서 수동으로 실행한 크롤러 포함)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        updated_at = datetime.fromisoformat(checkpoint["updated_at"])
+    except (OSError, ValueError, KeyError):
+        return False
+    return (checkpoint.get("status") == "running"
+            and datetime.now() - updated_at < timedelta(seconds=CRAWL_STALE_SECONDS))
+
 class CrawlerScheduler:
     def __init__(self):
         self.status = {
@@ -56,7 +73,9 @@ class CrawlerScheduler:
         self.status["last_run"] = datetime.now().isoformat()
         self.status["total_runs"] += 1
         self.save_status()
+        self.publish_status(RUN_STARTED)
         
+        success = False
         try:
             logging.info("크롤러 시작...")
             
@@ -69,6 +88,7 @@ class CrawlerScheduler:
             )
             
             if result.returncode == 0:
+                success = True
                 self.status["success_count"] += 1
                 logging.info("크롤러 실행 성공")
             else:
@@ -77,13 +97,43 @@ class CrawlerScheduler:
                 
         except subprocess.TimeoutExpired:
             self.status["error_count"] += 1
-            logging.error("크롤러 실행 타임아웃")
+            logging.error("크롤러 실행 타임아웃 (저장된 체크포인트에서 다음 실행 때 이어서 진행)")
         except Exception as e:
             self.status["error_count"] += 1
             logging.error(f"크롤러 실행 중 오류: {e}")
         finally:
             self.status["is_running"] = False
-            self.save_status()
+            self.update_next_run()
+            self.publish_status(RUN_FINISHED, success=success)
+    
+    def run_view_snapshot(self):
+        """최근 리포트 조회수 스냅샷 실행"""
+        if is_crawl_running():
+            logging.info("크롤링 진행 중이므로 조회수 스냅샷을 건너뜀 (다음 스냅샷에서 반영)")
+            return
+        
+        try:
+            result = subprocess.run(
+                ['python', 'src/view_tracker.py', '--days', '7'],
+                capture_output=True,
+                text=True,
+                timeout=300
+            )
+            if result.returncode == 0:
+                logging.info("조회수 스냅샷 완료")
+            else:
+                logging.error(f"조회수 스냅샷 실패: {result.stderr}")
+        except subprocess.TimeoutExpired:
+            logging.error("조회수 스냅샷 타임아웃")
+        except Exception as e:
+            logging.error(f"조회수 스냅샷 중 오류: {e}")
+    
+    def publish_status(self, event_type, **extra):
+        """대시보드가 상태 파일을 폴링하지 않도록 현재 상태를 이벤트로 발행"""
+        try:
+            publish_event(event_type, {"status": dict(self.status), **extra})
+        except Exception as e:
+            logging.error(f"이벤트 발행 실패: {e}")
     
     def schedule_jobs(self):
         """스케줄 작업 설정"""
@@ -92,11 +142,15 @@ class CrawlerScheduler:
         schedule.every().day.at("15:00").do(self.run_crawler)
         schedule.every().day.at("21:00").do(self.run_crawler)
         
+        # 매시 30분에 최근 7일 리포트 조회수 스냅샷
+        schedule.every().hour.at(":30").do(self.run_view_snapshot)
+        
         # 테스트용: 1분마다 실행
         # schedule.every(1).minutes.do(self.run_crawler)
         
         logging.info("스케줄 작업이 설정되었습니다.")
         logging.info("실행 시간: 매일 09:00, 15:00, 21:00")
+        logging.info("조회수 스냅샷: 매시 30분")
     
     def get_next_run_time(self):
         """다음 실행 시간 계산"""
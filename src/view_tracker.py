@@ -0,0 +1,231 @@
+"""
+리포트 조회수 추이 기록
+
+최근 N일 리포트의 조회수를 목록 페이지에서 다시 읽어, 이전 값과 달라진 경우에만
+(리포트ID, 시각, 조회수) 레코드를 append-only 바이너리 파일에 추가합니다.
+레코드는 12바이트 고정 길이이며, 오래된 레코드는 하루(현지 시각 기준) 단위로 다운샘플링하고
+작성일이 KEEP_REPORT_DAYS보다 오래된 리포트는 레코드와 메타 정보를 함께 삭제합니다.
+
+사용법:
+    python src/view_tracker.py --days 7
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+VIEWS_DIR = 'data/views'
+STORE_PATH = os.path.join(VIEWS_DIR, 'views.bin')
+META_PATH = os.path.join(VIEWS_DIR, 'reports.json')
+
+RECORD_DTYPE = np.dtype([('nid', '<u4'), ('ts', '<u4'), ('views', '<u4')])
+
+KEEP_FULL_DAYS = 7  # 이 기간보다 오래된 레코드는 하루 1개로 줄임
+KEEP_REPORT_DAYS = 90  # 작성일이 이 기간보다 오래된 리포트는 추이 기록을 삭제
+COMPACT_INTERVAL = 24 * 60 * 60
+
+# 레코드 시각은 UTC epoch 초이므로 날짜 구분과 화면 표시는 현지 시각으로 변환
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+LOCAL_UTC_OFFSET = int(datetime.now().astimezone().utcoffset().total_seconds())
+
+
+def load_records(path=STORE_PATH):
+    """저장된 조회수 레코드 전체를 numpy 구조 배열로 반환"""
+    if not os.path.exists(path):
+        return np.empty(0, dtype=RECORD_DTYPE)
+    # 기록 중 잘린 마지막 레코드는 무시
+    count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+    return np.fromfile(path, dtype=RECORD_DTYPE, count=count)
+
+
+def load_meta(path=META_PATH):
+    """리포트ID별 메타 정보(종목명, 제목, 증권사, 작성일)와 압축 시각을 반환"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"reports": {}, "last_compacted": 0}
+
+
+def save_meta(meta, path=META_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def latest_views(records):
+    """리포트ID별 가장 최근 조회수를 dict로 반환"""
+    if len(records) == 0:
+        return {}
+    order = np.lexsort((records['ts'], records['nid']))
+    ordered = records[order]
+    # 리포트ID가 바뀌기 직전 위치가 각 리포트의 마지막 레코드
+    last = np.append(ordered['nid'][1:] != ordered['nid'][:-1], True)
+    return dict(zip(ordered['nid'][last].tolist(), ordered['views'][last].tolist()))
+
+
+def append_records(records, path=STORE_PATH):
+    """레코드를 저장소 끝에 추가"""
+    if len(records) == 0:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def downsample(keep_days=KEEP_FULL_DAYS, path=STORE_PATH, now=None):
+    """keep_days보다 오래된 레코드는 리포트별로 하루의 마지막 값만 남김. 제거한 레코드 수 반환"""
+    records = load_records(path)
+    if len(records) == 0:
+        return 0
+
+    now = now or time.time()
+    cutoff = int(now - keep_days * 24 * 60 * 60)
+    old = records[records['ts'] < cutoff]
+    recent = records[records['ts'] >= cutoff]
+
+    if len(old):
+        old = old[np.lexsort((old['ts'], old['nid']))]
+        day = (old['ts'].astype('int64') + LOCAL_UTC_OFFSET) // (24 * 60 * 60)
+        # 다음 레코드와 (리포트ID, 날짜)가 다르면 그날의 마지막 값
+        last = np.append((old['nid'][1:] != old['nid'][:-1]) | (day[1:] != day[:-1]), True)
+        old = old[last]
+    kept = np.concatenate([old, recent])
+    _rewrite(kept, path)
+    return len(records) - len(kept)
+
+
+def prune_reports(meta, keep_days=KEEP_REPORT_DAYS, path=STORE_PATH, now=None):
+    """작성일이 keep_days보다 오래된 리포트의 메타 정보와 레코드를 삭제. 삭제한 리포트 수 반환"""
+    now = now or time.time()
+    cutoff = (datetime.fromtimestamp(now) - timedelta(days=keep_days)).strftime('%y.%m.%d')
+    expired = [nid for nid, info in meta["reports"].items() if info.get('작성일', '') < cutoff]
+    if not expired:
+        return 0
+
+    for nid in expired:
+        del meta["reports"][nid]
+    records = load_records(path)
+    kept = records[~np.isin(records['nid'], np.array(expired, dtype='u4'))]
+    if len(kept) != len(records):
+        _rewrite(kept, path)
+    return len(expired)
+
+
+def _rewrite(records, path):
+    tmp_path = f"{path}.tmp"
+    records.tofile(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def snapshot(days=7, now=None):
+    """최근 days일 리포트의 조회수를 읽어 바뀐 값만 저장. 추가한 레코드 수 반환"""
+    from crawler import load_report_rows
+
+    now = now or time.time()
+    cutoff = (datetime.fromtimestamp(now) - timedelta(days=days)).strftime('%y.%m.%d')
+
+    records = load_records()
+    known = latest_views(records)
+    meta = load_meta()
+
+    observed = {}
+    page = 1
+    while True:
+        rows = load_report_rows(page)
+        if not rows:
+            break
+
+        for row in rows:
+            if row['작성일'] < cutoff or not row.get('리포트ID'):
+                continue
+            try:
+                views = int(row['조회수'].replace(',', ''))
+            except ValueError:
+                continue
+            nid = int(row['리포트ID'])
+            observed[nid] = views
+            meta["reports"].setdefault(str(nid), {
+                key: row[key] for key in ('종목명', '제목', '증권사', '작성일')
+            })
+
+        # 목록은 최신순이므로 마지막 행이 기간을 벗어나면 중단
+        if rows[-1]['작성일'] < cutoff:
+            break
+        page += 1
+
+    changed = [(nid, int(now), views) for nid, views in observed.items() if known.get(nid) != views]
+    append_records(np.array(changed, dtype=RECORD_DTYPE))
+
+    if now - meta.get("last_compacted", 0) >= COMPACT_INTERVAL:
+        removed = downsample(now=now)
+        pruned = prune_reports(meta, now=now)
+        meta["last_compacted"] = now
+        print(f"다운샘플링: {removed}개 레코드 정리, 오래된 리포트 {pruned}개 삭제")
+
+    save_meta(meta)
+    print(f"조회수 스냅샷: {len(observed)}개 리포트 중 {len(changed)}개 변경")
+    return len(changed)
+
+
+def _records_frame(records):
+    frame = pd.DataFrame({
+        'nid': records['nid'].astype('int64'),
+        '시각': pd.to_datetime(records['ts'], unit='s', utc=True).tz_convert(LOCAL_TZ),
+        '조회수': records['views'].astype('int64'),
+    })
+    return frame.sort_values('시각')
+
+
+def view_series(nid, records=None):
+    """리포트 하나의 조회수 추이 (시각, 조회수)"""
+    records = load_records() if records is None else records
+    selected = records[records['nid'] == int(nid)]
+    return _records_frame(selected)[['시각', '조회수']].reset_index(drop=True)
+
+
+def broker_series(broker, freq='D', records=None, meta=None):
+    """증권사 리포트들의 조회수 합계 추이 (freq 간격)"""
+    records = load_records() if records is None else records
+    meta = load_meta() if meta is None else meta
+    nids = [int(nid) for nid, info in meta["reports"].items() if info.get('증권사') == broker]
+    selected = records[np.isin(records['nid'], nids)]
+    if len(selected) == 0:
+        return pd.DataFrame(columns=['시각', '조회수'])
+
+    frame = _records_frame(selected)
+    frame['시각'] = frame['시각'].dt.floor(freq)
+    # 레코드는 변경분만 있으므로 각 리포트의 마지막 값을 이후 구간으로 채운 뒤 합산
+    wide = frame.pivot_table(index='시각', columns='nid', values='조회수', aggfunc='last')
+    wide = wide.asfreq(freq).ffill()
+    return wide.sum(axis=1).rename('조회수').reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리포트 조회수 스냅샷")
+    parser.add_argument('--days', type=int, default=7, help="조회수를 다시 읽을 최근 일수")
+    parser.add_argument('--compact', action='store_true', help="스냅샷 없이 다운샘플링만 실행")
+    args = parser.parse_args()
+
+    print(f"조회수 스냅샷 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    if args.compact:
+        meta = load_meta()
+        removed = downsample()
+        pruned = prune_reports(meta)
+        save_meta(meta)
+        print(f"다운샘플링: {removed}개 레코드 정리, 오래된 리포트 {pruned}개 삭제")
+    else:
+        snapshot(days=args.days)
+
+
+if __name__ == "__main__":
+    main()